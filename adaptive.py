@@ -0,0 +1,138 @@
+"""
+自适应提醒间隔模块 (adaptive.py)
+固定间隔的提醒不管用户刚刚是否已经习惯性地喝过水，很多提醒发出后被忽略。
+开启自适应模式后，每次提醒和每次饮水后按以下数据计算下一次提醒的间隔（仍受活跃时段约束）：
+
+- 饮水习惯：users.drink_hours 是按本地小时统计的饮水次数直方图（每次记录饮水时在同一条语句中更新，
+  按 PATTERN_HALF_LIFE_DAYS 指数衰减，近期的习惯权重更大）。接下来一个间隔内用户通常会自己喝水时推迟提醒；
+- 目标进度：按活跃时段已过去的比例计算应完成的量，落后时缩短间隔，超前或已达成时拉长；
+- 提醒响应：reminders_sent / reminders_answered 统计提醒后一个间隔内有没有喝水，
+  长期不响应的用户降低提醒频率（多发也只是被忽略）。
+
+最终间隔为 interval_min × 系数，系数限制在 [MIN_FACTOR, MAX_FACTOR]，且不短于 MIN_INTERVAL 分钟。
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from timezones import hhmm_to_minutes
+
+HOURS = 24
+MINUTES_PER_DAY = 24 * 60
+
+# 饮水时间直方图的半衰期（天）
+PATTERN_HALF_LIFE_DAYS = 14
+# 提醒响应延迟的指数移动平均系数
+RESPONSE_EWMA_ALPHA = 0.2
+
+# 间隔系数范围和最短间隔（分钟）
+MIN_FACTOR = 0.5
+MAX_FACTOR = 2.0
+MIN_INTERVAL = 15
+
+# 进度落后 / 超前超过该比例才调整
+PACE_TOLERANCE = 0.1
+# 直方图总权重达到该值才按习惯调整（约一周的记录）
+MIN_PATTERN_WEIGHT = 8.0
+# 接下来一个间隔内的饮水概率为活跃时段平均值的多少倍时视为“通常会自己喝水”
+HABIT_RATIO = 1.5
+HABIT_FACTOR = 1.25
+# 至少发送过多少次提醒才按响应率调整，响应率低于该值时拉长间隔
+MIN_RESPONSE_SAMPLES = 10
+LOW_RESPONSE_RATE = 0.2
+IGNORED_FACTOR = 1.5
+
+
+def _window(user: Dict[str, Any]) -> Tuple[int, int]:
+    """活跃时段的起点和长度（分钟，start >= end 时跨越午夜）"""
+    start = hhmm_to_minutes(user.get("start_time"), 0)
+    end = hhmm_to_minutes(user.get("end_time"), MINUTES_PER_DAY)
+    length = (end - start) % MINUTES_PER_DAY or MINUTES_PER_DAY
+    return start, length
+
+
+def _mass(weights: Sequence[float], start: int, span: int) -> float:
+    """从本地分钟 start 起 span 分钟内的饮水权重（每分钟取所在小时的权重，按整小时分段累加）"""
+    total = 0.0
+    minute = start
+    remaining = span
+    while remaining > 0:
+        take = min(remaining, 60 - minute % 60)
+        total += weights[(minute // 60) % HOURS] * take
+        minute += take
+        remaining -= take
+    return total
+
+
+def pace_gap(user: Dict[str, Any], today_total: int, minute_of_day: int) -> Optional[float]:
+    """活跃时段已过去的比例 - 今日目标已完成的比例（正数为落后）；不在活跃时段内或没有目标时返回 None"""
+    goal = user.get("daily_goal") or 0
+    if goal <= 0:
+        return None
+    start, length = _window(user)
+    elapsed = (minute_of_day - start) % MINUTES_PER_DAY
+    if elapsed >= length:
+        return None
+    return elapsed / length - min(1.0, today_total / goal)
+
+
+def habit_ratio(drink_hours: Optional[Sequence[float]], user: Dict[str, Any],
+                minute_of_day: int, span: int) -> Optional[float]:
+    """接下来 span 分钟内的饮水权重相对活跃时段内平均水平的倍数；历史数据不足时返回 None"""
+    if not drink_hours or len(drink_hours) != HOURS:
+        return None
+    weights = [max(0.0, float(w or 0)) for w in drink_hours]
+    if sum(weights) < MIN_PATTERN_WEIGHT:
+        return None
+    start, length = _window(user)
+    active = _mass(weights, start, length) / length
+    if active <= 0:
+        return None
+    return _mass(weights, minute_of_day, span) / span / active
+
+
+def response_rate(user: Dict[str, Any]) -> Optional[float]:
+    """提醒后一个间隔内喝水的比例；样本不足时返回 None"""
+    sent = user.get("reminders_sent") or 0
+    if sent < MIN_RESPONSE_SAMPLES:
+        return None
+    return (user.get("reminders_answered") or 0) / sent
+
+
+def next_interval(user: Dict[str, Any], today_total: int, local_now: datetime) -> Tuple[int, str]:
+    """计算下一次提醒的间隔（分钟）和调整原因
+
+    user 为 users 表的一行（需要 interval_min、活跃时段、daily_goal、drink_hours 和提醒响应统计），
+    local_now 为用户本地时间。原因为 goal_reached / behind / ahead / habit / ignored 的组合，未调整时为 base。
+    """
+    base = max(1, int(user.get("interval_min") or 60))
+    minute_of_day = local_now.hour * 60 + local_now.minute
+    factor = 1.0
+    reasons = []
+
+    goal = user.get("daily_goal") or 0
+    if goal > 0 and today_total >= goal:
+        factor = MAX_FACTOR
+        reasons.append("goal_reached")
+    else:
+        gap = pace_gap(user, today_total, minute_of_day)
+        if gap is not None and gap > PACE_TOLERANCE:
+            factor *= 1 - min(1 - MIN_FACTOR, gap)
+            reasons.append("behind")
+        elif gap is not None and gap < -PACE_TOLERANCE:
+            factor *= 1 + min(MAX_FACTOR - 1, -gap)
+            reasons.append("ahead")
+
+        ratio = habit_ratio(user.get("drink_hours"), user, minute_of_day, base)
+        if ratio is not None and ratio >= HABIT_RATIO:
+            factor *= HABIT_FACTOR
+            reasons.append("habit")
+
+        rate = response_rate(user)
+        if rate is not None and rate < LOW_RESPONSE_RATE:
+            factor *= IGNORED_FACTOR
+            reasons.append("ignored")
+
+    factor = min(MAX_FACTOR, max(MIN_FACTOR, factor))
+    minutes = max(min(MIN_INTERVAL, base), int(round(base * factor)))
+    return minutes, "+".join(reasons) or "base"
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+自适应提醒间隔模拟 (benchmarks/bench_adaptive.py)
+用合成用户按 5 分钟步长模拟若干天的饮水和提醒，对比固定间隔和 adaptive.next_interval 两种策略的
+发送次数、被忽略的提醒数和“每达成一次今日目标发送的提醒数”，结果写入 JSON 文件。不需要数据库。
+
+合成用户：随机的活跃时段、目标和提醒间隔；每人有几个习惯性喝水的时段（不提醒也会自己喝），
+以及对提醒的响应概率（一部分用户基本忽略提醒）。两种策略使用相同的随机种子。
+
+用法示例:
+    python benchmarks/bench_adaptive.py --users 2000 --days 28 --output bench_adaptive.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adaptive import HOURS, PATTERN_HALF_LIFE_DAYS, next_interval  # noqa: E402
+
+STEP_MIN = 5
+STEPS_PER_DAY = 24 * 60 // STEP_MIN
+INTERVALS = [45, 60, 90, 120]
+DAY_DECAY = 0.5 ** (1 / PATTERN_HALF_LIFE_DAYS)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="自适应提醒间隔模拟")
+    parser.add_argument("--users", type=int, default=2_000, help="合成用户数")
+    parser.add_argument("--days", type=int, default=28, help="模拟天数")
+    parser.add_argument("--output", default="bench_adaptive.json", help="结果输出文件 (JSON)")
+    parser.add_argument("--random-seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def synthetic_user(i, rng):
+    """一个合成用户：设置（字段与 users 表一致）+ 行为参数"""
+    start_h = rng.randint(6, 9)
+    end_h = rng.randint(21, 23)
+    habits = [0.0] * HOURS
+    for hour in rng.sample(range(start_h, end_h), rng.randint(2, 5)):
+        habits[hour] = rng.uniform(0.4, 0.9)  # 该小时内自己喝水的概率
+    return {
+        "user_id": i,
+        "interval_min": rng.choice(INTERVALS),
+        "start_time": f"{start_h:02d}:00",
+        "end_time": f"{end_h:02d}:00",
+        "daily_goal": rng.choice([1500, 2000, 2500]),
+        "cup": rng.choice([200, 250, 300]),
+        "habits": habits,
+        "response": rng.choice([0.1, 0.4, 0.7, 0.9]),  # 收到提醒后喝水的概率
+    }
+
+
+def simulate(profile, days, adaptive, seed):
+    """模拟一个用户 days 天，返回计数"""
+    rng = random.Random(seed)
+    user = {k: profile[k] for k in ("user_id", "interval_min", "start_time", "end_time", "daily_goal")}
+    user.update(drink_hours=[0.0] * HOURS, reminders_sent=0, reminders_answered=0)
+    start = int(profile["start_time"][:2]) * 60
+    end = int(profile["end_time"][:2]) * 60
+    counts = {"sent": 0, "answered": 0, "drinks": 0, "goals_reached": 0}
+    base = datetime(2026, 1, 5)
+
+    for day in range(days):
+        user["drink_hours"] = [w * DAY_DECAY for w in user["drink_hours"]]
+        total = 0
+        next_due = start  # 每天活跃时段开始时第一次提醒
+        last_reminder = None
+        pending_response = None  # 用户打算在该分钟响应提醒喝水
+
+        def drink(minute, local):
+            nonlocal total, last_reminder, next_due
+            if last_reminder is not None and minute - last_reminder < user["interval_min"]:
+                user["reminders_answered"] += 1
+                counts["answered"] += 1
+            last_reminder = None
+            before = total
+            total += profile["cup"]
+            counts["drinks"] += 1
+            user["drink_hours"][minute // 60] += 1
+            if before < user["daily_goal"] <= total:
+                counts["goals_reached"] += 1
+            gap = next_interval(user, total, local)[0] if adaptive else user["interval_min"]
+            next_due = minute + gap
+
+        for step in range(STEPS_PER_DAY):
+            minute = step * STEP_MIN
+            if not (start <= minute < end):
+                continue
+            local = base + timedelta(days=day, minutes=minute)
+            habit = profile["habits"][minute // 60]
+            if pending_response is not None and minute >= pending_response:
+                pending_response = None
+                drink(minute, local)
+            elif habit and rng.random() < habit * STEP_MIN / 60:
+                drink(minute, local)
+            elif minute >= next_due:
+                counts["sent"] += 1
+                user["reminders_sent"] += 1
+                last_reminder = minute
+                if rng.random() < profile["response"]:
+                    pending_response = minute + rng.choice([5, 10, 15, 20])
+                gap = next_interval(user, total, local)[0] if adaptive else user["interval_min"]
+                next_due = minute + gap
+    return counts
+
+
+def run(profiles, days, adaptive, seed):
+    totals = {"sent": 0, "answered": 0, "drinks": 0, "goals_reached": 0}
+    started = time.perf_counter()
+    for profile in profiles:
+        for key, value in simulate(profile, days, adaptive, seed + profile["user_id"]).items():
+            totals[key] += value
+    totals["ignored"] = totals["sent"] - totals["answered"]
+    totals["sends_per_goal"] = round(totals["sent"] / totals["goals_reached"], 3) if totals["goals_reached"] else None
+    totals["goal_rate"] = round(totals["goals_reached"] / (len(profiles) * days), 4)
+    totals["wall_s"] = round(time.perf_counter() - started, 2)
+    return totals
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.random_seed)
+    profiles = [synthetic_user(i, rng) for i in range(args.users)]
+
+    results = {}
+    for name, adaptive in (("fixed", False), ("adaptive", True)):
+        print(f"[基准] ▶ {name}")
+        results[name] = run(profiles, args.days, adaptive, args.random_seed)
+        r = results[name]
+        print(f"[基准]   发送 {r['sent']} 条 (被忽略 {r['ignored']}) | 达成目标 {r['goals_reached']} 次 "
+              f"(达成率 {r['goal_rate']:.1%}) | 每次达成 {r['sends_per_goal']} 条")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "users": args.users,
+            "days": args.days,
+            "step_min": STEP_MIN,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"[基准] ✅ 结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+图表渲染基准测试 (benchmarks/bench_charts.py)
+测量 7 / 30 / 90 天趋势图的渲染吞吐量：先在当前进程内串行渲染得到单核每秒张数，
+再用不同大小的 ProcessPoolExecutor 并行渲染，结果写入 JSON 文件。不需要数据库。
+
+用法示例:
+    python benchmarks/bench_charts.py --charts 200 --workers 1 2 4 --output bench_charts.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from charts import CHART_RANGES, render_trend_chart  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="图表渲染基准测试")
+    parser.add_argument("--charts", type=int, default=200, help="每个天数范围渲染的图表数")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="进程池大小列表")
+    parser.add_argument("--output", default="bench_charts.json", help="结果输出文件 (JSON)")
+    parser.add_argument("--random-seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def synthetic_series(days, rng):
+    """生成一组合成的每日饮水量"""
+    today = date.today()
+    labels = [(today - timedelta(days=offset)).strftime("%m-%d") for offset in range(days - 1, -1, -1)]
+    totals = [max(0, int(rng.gauss(2200, 600))) for _ in range(days)]
+    return labels, totals, 2500, f"Water intake - last {days} days (ml)"
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.random_seed)
+    results = {}
+
+    for days in CHART_RANGES:
+        inputs = [synthetic_series(days, rng) for _ in range(args.charts)]
+
+        # 单核：当前进程串行渲染
+        started = time.perf_counter()
+        sizes = [len(render_trend_chart(*item)) for item in inputs]
+        serial = time.perf_counter() - started
+
+        pooled = {}
+        for workers in args.workers:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # 预热：启动子进程并导入 Pillow，不计入耗时
+                list(pool.map(render_trend_chart, *zip(*inputs[:workers])))
+                started = time.perf_counter()
+                list(pool.map(render_trend_chart, *zip(*inputs), chunksize=4))
+                elapsed = time.perf_counter() - started
+            pooled[str(workers)] = {
+                "wall_s": elapsed,
+                "charts_per_s": args.charts / elapsed,
+                "charts_per_s_per_worker": args.charts / elapsed / workers,
+            }
+
+        results[str(days)] = {
+            "serial_charts_per_s": args.charts / serial,
+            "serial_ms_per_chart": serial / args.charts * 1000,
+            "avg_png_bytes": sum(sizes) / len(sizes),
+            "pool": pooled,
+        }
+        print(f"[基准] {days} 天: 单核 {args.charts / serial:.1f} 张/秒 "
+              f"({serial / args.charts * 1000:.2f}ms/张), PNG 平均 {sum(sizes) / len(sizes) / 1024:.1f}KB")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "charts": args.charts,
+            "workers": args.workers,
+        },
+        "ranges": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"[基准] ✅ 结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
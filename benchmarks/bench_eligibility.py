@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+提醒资格计算基准测试 (benchmarks/bench_eligibility.py)
+生成合成的提醒调度表（默认 100 万用户，混合整数偏移和 IANA 时区、
+跨午夜活跃时段和免打扰时段），测量 tick 模式每个周期计算到期用户的耗时，
+结果写入 JSON 文件。不需要数据库。
+
+用法示例:
+    python benchmarks/bench_eligibility.py --users 1000000 --ticks 50 --output bench_eligibility.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eligibility import ReminderTable  # noqa: E402
+
+USER_ID_BASE = 9_000_000_000
+
+IANA_ZONES = [
+    "Asia/Shanghai", "Asia/Kolkata", "Asia/Tokyo", "Europe/Berlin", "Europe/London",
+    "America/New_York", "America/Los_Angeles", "Australia/Adelaide", "America/Sao_Paulo",
+]
+INTERVALS = [30, 45, 60, 90, 120]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="提醒资格计算基准测试")
+    parser.add_argument("--users", type=int, default=1_000_000, help="合成用户数")
+    parser.add_argument("--ticks", type=int, default=50, help="模拟的调度周期数")
+    parser.add_argument("--tick-seconds", type=int, default=60, help="相邻周期间隔（秒）")
+    parser.add_argument("--output", default="bench_eligibility.json", help="结果输出文件 (JSON)")
+    parser.add_argument("--random-seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def synthetic_user(i, rng, now):
+    """生成一行合成用户设置（字段与 users 表一致）"""
+    start_h = rng.randint(5, 10)
+    end_h = rng.choice([21, 22, 23, 1, 2])  # 部分用户活跃时段跨越午夜
+    quiet = []
+    if rng.random() < 0.3:
+        quiet.append({"start": "12:00", "end": "13:30"})
+    if rng.random() < 0.1:
+        quiet.append({"start": "18:00", "end": "19:00"})
+    interval = rng.choice(INTERVALS)
+    return {
+        "user_id": USER_ID_BASE + i,
+        "interval_min": interval,
+        "start_time": f"{start_h:02d}:00",
+        "end_time": f"{end_h:02d}:00",
+        "timezone": rng.randint(-12, 14),
+        "tz_name": rng.choice(IANA_ZONES) if rng.random() < 0.4 else None,
+        "is_disabled": 1 if rng.random() < 0.02 else 0,
+        "quiet_hours": quiet,
+        "last_remind_time": now - timedelta(minutes=rng.randint(0, interval * 2)),
+    }
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return {
+        "calls": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pct(0.50),
+        "p90_ms": pct(0.90),
+        "p99_ms": pct(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.random_seed)
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+
+    print(f"[基准] 生成 {args.users} 位合成用户...")
+    table = ReminderTable()
+    started = time.perf_counter()
+    for i in range(args.users):
+        table.upsert(synthetic_user(i, rng, now))
+    load_seconds = time.perf_counter() - started
+    print(f"[基准] 调度表加载耗时 {load_seconds:.2f}s")
+
+    due_samples, mark_samples, due_counts = [], [], []
+    for tick in range(args.ticks):
+        tick_time = now + timedelta(seconds=tick * args.tick_seconds)
+
+        t0 = time.perf_counter()
+        due_ids = table.due(tick_time)
+        due_samples.append(time.perf_counter() - t0)
+
+        ids = due_ids.tolist()
+        t0 = time.perf_counter()
+        table.mark_sent(ids, tick_time)
+        mark_samples.append(time.perf_counter() - t0)
+        due_counts.append(len(ids))
+
+    due_stats = summarize(due_samples)
+    print(f"[基准] due() p50 {due_stats['p50_ms']:.2f}ms p99 {due_stats['p99_ms']:.2f}ms | "
+          f"平均每周期到期 {statistics.fmean(due_counts):.0f} 位用户")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "users": args.users,
+            "ticks": args.ticks,
+            "tick_seconds": args.tick_seconds,
+            "load_seconds": load_seconds,
+        },
+        "due": due_stats,
+        "mark_sent": summarize(mark_samples),
+        "due_per_tick": {
+            "mean": statistics.fmean(due_counts),
+            "max": max(due_counts),
+        },
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"[基准] ✅ 结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+统计图表模块 (charts.py)
+用 Pillow 把每日饮水量渲染为带目标线的柱状趋势图（PNG）。
+
+渲染在 ProcessPoolExecutor 中执行，事件循环不会被 CPU 密集的绘图阻塞。
+渲染结果按 (用户, 天数, 数据摘要) 缓存，数据不变时直接复用；
+同一张图发送过一次后记录 Telegram 返回的 file_id，之后不再重复上传。
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 图表支持的天数范围
+CHART_RANGES = (7, 30, 90)
+
+WIDTH, HEIGHT = 800, 420
+MARGIN_LEFT, MARGIN_RIGHT, MARGIN_TOP, MARGIN_BOTTOM = 60, 20, 40, 50
+
+BACKGROUND = (255, 255, 255)
+AXIS_COLOR = (120, 120, 120)
+GRID_COLOR = (230, 230, 230)
+BAR_COLOR = (66, 153, 225)
+BAR_HIT_COLOR = (56, 178, 112)
+GOAL_COLOR = (229, 62, 62)
+TEXT_COLOR = (40, 40, 40)
+
+ChartKey = Tuple[int, int, str]
+
+
+def render_trend_chart(labels: Sequence[str], totals: Sequence[int], goal: int, title: str) -> bytes:
+    """渲染每日饮水量柱状图（带目标虚线），返回 PNG 字节
+
+    模块级纯函数，可以被 ProcessPoolExecutor 序列化后在子进程中执行。
+    默认位图字体不含中文字形，图内文字使用英文。
+    Pillow 在这里才导入：只有渲染子进程需要加载它，机器人主进程启动时不导入。
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    image = Image.new("RGB", (WIDTH, HEIGHT), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+
+    plot_w = WIDTH - MARGIN_LEFT - MARGIN_RIGHT
+    plot_h = HEIGHT - MARGIN_TOP - MARGIN_BOTTOM
+    top_value = max(max(totals, default=0), goal, 1) * 1.15
+    bottom = MARGIN_TOP + plot_h
+
+    def y_of(value: float) -> float:
+        return bottom - value / top_value * plot_h
+
+    # 网格和纵轴刻度
+    for step in range(5):
+        value = top_value * step / 4
+        y = y_of(value)
+        draw.line([(MARGIN_LEFT, y), (WIDTH - MARGIN_RIGHT, y)], fill=GRID_COLOR)
+        draw.text((5, y - 6), f"{int(value)}", fill=AXIS_COLOR, font=font)
+    draw.line([(MARGIN_LEFT, MARGIN_TOP), (MARGIN_LEFT, bottom)], fill=AXIS_COLOR)
+    draw.line([(MARGIN_LEFT, bottom), (WIDTH - MARGIN_RIGHT, bottom)], fill=AXIS_COLOR)
+
+    # 柱状图：达标的日期用绿色
+    count = max(len(totals), 1)
+    slot = plot_w / count
+    bar_w = max(1.0, slot * 0.7)
+    label_every = max(1, count // 10)
+    for i, total in enumerate(totals):
+        x0 = MARGIN_LEFT + i * slot + (slot - bar_w) / 2
+        color = BAR_HIT_COLOR if goal > 0 and total >= goal else BAR_COLOR
+        if total > 0:
+            draw.rectangle([x0, y_of(total), x0 + bar_w, bottom], fill=color)
+        if i % label_every == 0 or i == count - 1:
+            draw.text((x0, bottom + 8), labels[i], fill=AXIS_COLOR, font=font)
+
+    # 目标虚线
+    if goal > 0:
+        y = y_of(goal)
+        x = MARGIN_LEFT
+        while x < WIDTH - MARGIN_RIGHT:
+            draw.line([(x, y), (min(x + 8, WIDTH - MARGIN_RIGHT), y)], fill=GOAL_COLOR, width=2)
+            x += 14
+        draw.text((WIDTH - MARGIN_RIGHT - 90, y - 14), f"goal {goal}ml", fill=GOAL_COLOR, font=font)
+
+    draw.text((MARGIN_LEFT, 12), title, fill=TEXT_COLOR, font=font)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=False)
+    return buffer.getvalue()
+
+
+def data_digest(labels: Sequence[str], totals: Sequence[int], goal: int) -> str:
+    """图表输入数据的摘要，作为缓存键中的数据版本"""
+    payload = f"{goal}|{','.join(labels)}|{','.join(map(str, totals))}"
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class ChartRenderer:
+    """图表渲染器：进程池渲染 + PNG 缓存 + Telegram file_id 复用"""
+
+    def __init__(self, workers: int = 2, cache_size: int = 256):
+        self.workers = workers
+        self.cache_size = cache_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._images: "OrderedDict[ChartKey, bytes]" = OrderedDict()
+        self._file_ids: "OrderedDict[ChartKey, str]" = OrderedDict()
+        self._inflight: Dict[ChartKey, asyncio.Future] = {}
+        self.stats = {"rendered": 0, "cache_hits": 0, "file_id_hits": 0}
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            logger.info(f"[图表] 渲染进程池已启动 ({self.workers} 个进程)")
+        return self._pool
+
+    def _remember(self, cache: OrderedDict, key: ChartKey, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def file_id(self, key: ChartKey) -> Optional[str]:
+        """已上传过的同一张图的 Telegram file_id"""
+        file_id = self._file_ids.get(key)
+        if file_id:
+            self._file_ids.move_to_end(key)
+            self.stats["file_id_hits"] += 1
+        return file_id
+
+    def remember_file_id(self, key: ChartKey, file_id: str):
+        self._remember(self._file_ids, key, file_id)
+
+    async def render(self, key: ChartKey, labels: List[str], totals: List[int], goal: int, title: str) -> bytes:
+        """获取图表 PNG：命中缓存直接返回，否则在进程池中渲染（同一键并发请求只渲染一次）"""
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return image
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await pending
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor(), render_trend_chart, labels, totals, goal, title)
+        self._inflight[key] = future
+        try:
+            image = await future
+        finally:
+            self._inflight.pop(key, None)
+        self.stats["rendered"] += 1
+        self._remember(self._images, key, image)
+        return image
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -8,16 +8,25 @@ import sys
 import logging
 from dotenv import load_dotenv
 
-# 早期日志配置
-logging.basicConfig(
-    level=logging.INFO,
-    format="[%(asctime)s] %(levelname)s: %(message)s"
-)
-logger = logging.getLogger(__name__)
+from logs import parse_sample_rates, setup_logging
 
 # 加载 .env 文件
 load_dotenv()
 
+# ==================== 日志配置 ====================
+# 日志先写入内存队列，由后台线程格式化并输出，事件循环不会被 stdout 写入阻塞
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()  # json: 每行一个 JSON 对象；text: 传统文本格式
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))  # 队列满时丢弃新日志（计数并在恢复后告警）
+# 按类别采样：类别为消息开头的 [标签]（没有标签时为日志器名），值为每秒最多输出的 INFO 日志条数；
+# WARNING 及以上级别不受限制
+LOG_SAMPLE_RATES = parse_sample_rates(os.getenv(
+    "LOG_SAMPLE_RATES",
+    "提醒=10,调度=10,记录=10,每日通知=10,每日报告=10,aiogram.event=10,apscheduler.executors.default=10",
+))
+setup_logging(level=LOG_LEVEL, fmt=LOG_FORMAT, sample_rates=LOG_SAMPLE_RATES, queue_size=LOG_QUEUE_SIZE)
+logger = logging.getLogger(__name__)
+
 # ==================== Telegram Bot 配置 ====================
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 if not TELEGRAM_TOKEN:
@@ -47,6 +56,37 @@ if not DATABASE_URL.startswith(("postgresql://", "postgresql+asyncpg://")):
     logger.error(f"   你的 URL: {DATABASE_URL[:50]}...")
     sys.exit(1)
 
+# 连接池大小
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 5))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 20))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))  # asyncpg 预编译语句缓存大小（每个连接）
+# 等待空闲连接的最长时间（秒），超时抛出 asyncio.TimeoutError 而不是无限挂起
+DB_POOL_ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", 10))
+DB_POOL_SLOW_WAIT = float(os.getenv("DB_POOL_SLOW_WAIT", 0.5))  # 等待连接超过该阈值（秒）计为一次“慢等待”
+# PgBouncer 事务池模式：禁用命名预编译语句
+DB_PGBOUNCER_MODE = os.getenv("DB_PGBOUNCER_MODE", "").lower() in ("1", "true", "yes")
+# 各类别的单条查询超时（秒）：交互（用户消息处理）、定时（提醒和每日通知 Job）、批量（后台任务）、管理（管理员命令和建表迁移）
+DB_TIMEOUT_INTERACTIVE = float(os.getenv("DB_TIMEOUT_INTERACTIVE", 10))
+DB_TIMEOUT_SCHEDULED = float(os.getenv("DB_TIMEOUT_SCHEDULED", 30))
+DB_TIMEOUT_BATCH = float(os.getenv("DB_TIMEOUT_BATCH", 60))
+DB_TIMEOUT_ADMIN = float(os.getenv("DB_TIMEOUT_ADMIN", 30))
+# 只读副本（可选）：统计和管理员查询走副本，写入和“读自己刚写入的数据”仍走主库
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL", "")
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", 5))  # 副本复制延迟超过该值（秒）时自动改走主库
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_LAG_CHECK_INTERVAL", 10))  # 副本延迟检测间隔（秒）
+# 准入控制：为交互查询保留的连接数，其余类别合计最多占用 (池大小 - 保留数) 个连接
+DB_INTERACTIVE_RESERVE = int(os.getenv("DB_INTERACTIVE_RESERVE", 5))
+# 定时任务同时占用的连接数上限；等待超过 DB_SCHEDULED_MAX_WAIT 秒即放弃（DatabaseBusy），由调用方推迟重试
+DB_SCHEDULED_BUDGET = int(os.getenv("DB_SCHEDULED_BUDGET", 4))
+DB_SCHEDULED_MAX_WAIT = float(os.getenv("DB_SCHEDULED_MAX_WAIT", 1))
+# 批量任务和管理查询各自同时占用的连接数上限；等待期间让出给交互和定时查询，最多等待该类别的查询超时
+DB_BATCH_BUDGET = int(os.getenv("DB_BATCH_BUDGET", 3))
+# 查询追踪：按 (方法, SQL 指纹) 统计查询耗时、行数和连接等待时间
+DB_QUERY_TRACE = os.getenv("DB_QUERY_TRACE", "true").lower() in ("1", "true", "yes")
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", 200))  # 耗时超过该值（毫秒）的查询写入慢查询日志
+# 对慢的只读查询抽样执行 EXPLAIN (ANALYZE)（会再执行一次该查询，默认关闭）
+DB_SLOW_QUERY_EXPLAIN = os.getenv("DB_SLOW_QUERY_EXPLAIN", "").lower() in ("1", "true", "yes")
+
 # ==================== 应用配置 ====================
 APP_PORT = int(os.getenv("PORT", 8080))  # Koyeb 默认使用 8080 端口
 APP_HOST = "0.0.0.0"  # 监听所有网卡
@@ -63,6 +103,71 @@ else:
 UPTIMEROBOT_URL = os.getenv("UPTIMEROBOT_URL")  # UptimeRobot 监控 URL（可选）
 # 如果设置此 URL，机器人会在后台定期 ping 以保持应用在线
 
+# ==================== 发件箱配置 ====================
+# 提醒和每日通知先写入 outbox 表，再由独立的发送协程池投递
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", 4))  # 并发发送协程数
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 20))  # 每次领取的消息数
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", 2))  # 空闲时轮询间隔（秒）
+OUTBOX_LEASE_SECONDS = 60  # 领取后的租约时长，超时未完成视为发送进程崩溃，重新投递
+OUTBOX_MAX_ATTEMPTS = 5  # 最大投递次数
+OUTBOX_RETENTION_DAYS = 3  # 已完成消息的保留天数
+
+# ==================== 数据保留配置 ====================
+# 超过 RETENTION_DAYS 天的原始记录归档为本地 CSV.gz 文件并汇总到每日统计表（0 表示不归档）
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", 90))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")  # 归档文件根目录（按月分区）
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", 5000))  # 每批归档/删除的记录数
+RETENTION_MAX_BATCHES = 200  # 每次运行最多处理的批数，剩余部分留到下次
+
+# ==================== 数据导出配置 ====================
+EXPORT_COOLDOWN_SECONDS = int(os.getenv("EXPORT_COOLDOWN_SECONDS", 3600))  # 同一用户两次 /export 的最短间隔
+EXPORT_CHUNK_ROWS = 1000  # 游标每批读取 / 每次写入文件的行数
+
+# ==================== 统计图表配置 ====================
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", min(2, os.cpu_count() or 1)))  # 图表渲染进程数
+CHART_CACHE_SIZE = 256  # 缓存的图表 PNG / file_id 数量
+
+# ==================== 群组挑战配置 ====================
+LEADERBOARD_SIZE = 10  # 排行榜显示的名次数
+GROUP_REMIND_MIN_INTERVAL = 30  # 群组提醒的最短间隔（分钟）
+GROUP_REMIND_MAX_MENTIONS = 20  # 群组提醒中最多点名的未喝水成员数
+
+# ==================== 更新处理配置 ====================
+# 同一用户的更新按顺序逐条处理，不同用户并发处理；同时运行的处理器数上限
+UPDATE_CONCURRENCY = int(os.getenv("UPDATE_CONCURRENCY", 64))
+
+# ==================== 事件循环配置 ====================
+# 使用 uvloop 替换默认事件循环（需要安装 uvloop，未安装时回退到 asyncio 默认循环）
+USE_UVLOOP = os.getenv("USE_UVLOOP", "").lower() in ("1", "true", "yes")
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", 0.5))  # 事件循环延迟采样间隔（秒）
+# 事件循环延迟超过该值（毫秒）时记录告警，并附带阻塞期间事件循环线程的调用栈
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", 200))
+
+# ==================== 滚动重启交接配置 ====================
+# 开启后：停机时等待处理中的消息完成，保存轮询 offset 和调度状态；新进程等待旧进程交出轮询后
+# 从该 offset 继续接收并恢复调度，启动时不再丢弃部署期间积压的消息
+HANDOVER_MODE = os.getenv("HANDOVER_MODE", "").lower() in ("1", "true", "yes")
+HANDOVER_DRAIN_SECONDS = float(os.getenv("HANDOVER_DRAIN_SECONDS", 20))  # 停机时等待处理中消息的最长时间
+HANDOVER_WAIT_SECONDS = float(os.getenv("HANDOVER_WAIT_SECONDS", 60))  # 新进程等待旧进程交出轮询的最长时间
+POLLER_HEARTBEAT_SECONDS = 5  # 轮询租约心跳间隔，超过 3 倍间隔未刷新视为旧进程已崩溃
+
+# ==================== 提醒调度配置 ====================
+# jobs: 每个用户一个 APScheduler Job（默认）
+# tick: 所有用户保存在内存列式调度表中，每个周期一次向量化计算得出到期用户并批量入队
+REMINDER_DISPATCH_MODE = os.getenv("REMINDER_DISPATCH_MODE", "jobs").lower()
+REMINDER_TICK_SECONDS = int(os.getenv("REMINDER_TICK_SECONDS", 60))  # tick 模式的调度周期
+REMINDER_TICK_BATCH = 5000  # tick 模式每批渲染/入队的用户数
+# 自适应提醒间隔：按用户的饮水时间习惯、今日目标进度和提醒响应率调整每次提醒后的间隔（见 adaptive.py）
+ADAPTIVE_REMINDERS = os.getenv("ADAPTIVE_REMINDERS", "").lower() in ("1", "true", "yes")
+# 连接池繁忙时定时 Job（提醒、每日通知）推迟重试的基础秒数（实际为 1~2 倍，错开重试）
+SCHEDULED_DEFER_SECONDS = int(os.getenv("SCHEDULED_DEFER_SECONDS", 30))
+
+# ==================== 定时任务存储配置 ====================
+# postgres: 用户的提醒、每日通知和明日恢复 Job 持久化到 scheduler_jobs 表，重启后一次查询全部恢复（默认）
+# memory: 只保存在内存中，重启后由用户交互或滚动重启交接重建
+SCHEDULER_JOB_STORE = os.getenv("SCHEDULER_JOB_STORE", "postgres").lower()
+SCHEDULER_JOB_FLUSH_SECONDS = float(os.getenv("SCHEDULER_JOB_FLUSH_SECONDS", 2))  # Job 变更批量写入数据库的间隔
+
 # ==================== 业务常量 ====================
 
 # 默认用户设置
@@ -72,6 +177,9 @@ DEFAULT_START_TIME = "08:00"
 DEFAULT_END_TIME = "22:00"
 DEFAULT_TIMEZONE = 8  # UTC+8
 
+# 提醒消息下方的一键记录按钮（ml）
+QUICK_LOG_AMOUNTS = [150, 250, 350, 500]
+
 # 智能评价阈值
 EVALUATION_THRESHOLDS = {
     "low": 0.5,      # 低于 50% 鼓励
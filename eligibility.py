@@ -0,0 +1,197 @@
+"""
+提醒资格计算模块 (eligibility.py)
+把所有已调度用户的提醒参数保存在按列存储的 NumPy 数组中：
+活跃时段起止（本地分钟数）、时区、提醒间隔、下次到期时间、免打扰时段和状态标志。
+每个调度周期只需一次向量化计算，就能得到“已到期且应当提醒”的整批用户，
+不再逐个用户解析时间字符串、查询数据库。
+"""
+
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from timezones import TimezoneSpec, hhmm_to_minutes, parse_quiet_hours, user_tz, utc_offsets_bulk, zone_key
+
+# 每个用户最多保存的免打扰时段数
+QUIET_SLOTS = 8
+
+# 状态标志位
+FLAG_DISABLED = 1       # 用户禁用提醒
+FLAG_BLACKLISTED = 2    # 被管理员拉黑
+
+_INITIAL_CAPACITY = 1024
+
+
+def _to_epoch(utc_dt: Optional[datetime]) -> int:
+    """naive UTC datetime → epoch 秒；None 视为 0（立即到期）"""
+    if utc_dt is None:
+        return 0
+    return int(utc_dt.replace(tzinfo=dt_timezone.utc).timestamp())
+
+
+class ReminderTable:
+    """按列存储的提醒调度表"""
+
+    def __init__(self, capacity: int = _INITIAL_CAPACITY):
+        self.size = 0
+        self._index: Dict[int, int] = {}
+        # 时区去重：每个不同的时区只在每个周期计算一次偏移
+        self._zones: List[TimezoneSpec] = []
+        self._zone_index: Dict[str, int] = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        self.user_ids = np.zeros(capacity, dtype=np.int64)
+        self.start_min = np.zeros(capacity, dtype=np.int16)
+        self.end_min = np.zeros(capacity, dtype=np.int16)
+        self.zone = np.zeros(capacity, dtype=np.int32)
+        self.interval_sec = np.zeros(capacity, dtype=np.int32)
+        self.next_due = np.zeros(capacity, dtype=np.int64)
+        self.flags = np.zeros(capacity, dtype=np.uint8)
+        # 免打扰时段：未使用的槽位起点为 -1
+        self.quiet_start = np.full((capacity, QUIET_SLOTS), -1, dtype=np.int16)
+        self.quiet_end = np.full((capacity, QUIET_SLOTS), -1, dtype=np.int16)
+
+    def _grow(self):
+        columns = ("user_ids", "start_min", "end_min", "zone", "interval_sec", "next_due", "flags",
+                   "quiet_start", "quiet_end")
+        old = {name: getattr(self, name) for name in columns}
+        self._allocate(len(self.user_ids) * 2)
+        for name, values in old.items():
+            getattr(self, name)[:self.size] = values[:self.size]
+
+    def _zone_id(self, tz: TimezoneSpec) -> int:
+        key = zone_key(tz)
+        if key not in self._zone_index:
+            self._zone_index[key] = len(self._zones)
+            self._zones.append(tz)
+        return self._zone_index[key]
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._index
+
+    # ==================== 维护 ====================
+
+    def upsert(self, user: Dict[str, Any], blacklisted: bool = False, next_due: Optional[datetime] = None):
+        """加入或更新一个用户（user 为 users 表的一行）
+
+        next_due 默认为 last_remind_time + 提醒间隔。
+        """
+        user_id = user["user_id"]
+        row = self._index.get(user_id)
+        if row is None:
+            if self.size == len(self.user_ids):
+                self._grow()
+            row = self.size
+            self.size += 1
+            self._index[user_id] = row
+
+        interval_sec = max(1, int(user.get("interval_min") or 60)) * 60
+        self.user_ids[row] = user_id
+        self.start_min[row] = hhmm_to_minutes(user.get("start_time"), 0)
+        self.end_min[row] = hhmm_to_minutes(user.get("end_time"), 24 * 60)
+        self.zone[row] = self._zone_id(user_tz(user))
+        self.interval_sec[row] = interval_sec
+        if next_due is not None:
+            self.next_due[row] = _to_epoch(next_due)
+        else:
+            last = user.get("last_remind_time")
+            self.next_due[row] = _to_epoch(last) + interval_sec if last else 0
+
+        flags = 0
+        if user.get("is_disabled"):
+            flags |= FLAG_DISABLED
+        if blacklisted:
+            flags |= FLAG_BLACKLISTED
+        self.flags[row] = flags
+        self.set_quiet_hours(user_id, user.get("quiet_hours"))
+
+    def set_quiet_hours(self, user_id: int, quiet_hours):
+        """更新免打扰时段（接受 JSON 文本或 [{"start", "end"}] 列表）"""
+        row = self._index.get(user_id)
+        if row is None:
+            return
+        self.quiet_start[row] = -1
+        self.quiet_end[row] = -1
+        for slot, period in enumerate(parse_quiet_hours(quiet_hours)[:QUIET_SLOTS]):
+            self.quiet_start[row, slot] = hhmm_to_minutes(period.get("start"), -1)
+            self.quiet_end[row, slot] = hhmm_to_minutes(period.get("end"), -1)
+
+    def reschedule(self, user_id: int, next_due: datetime):
+        """在内存中调整用户的下次到期时间"""
+        row = self._index.get(user_id)
+        if row is not None:
+            self.next_due[row] = _to_epoch(next_due)
+
+    def remove(self, user_id: int):
+        """移除用户（与最后一行交换，保持数组紧凑）"""
+        row = self._index.pop(user_id, None)
+        if row is None:
+            return
+        last = self.size - 1
+        if row != last:
+            for name in ("user_ids", "start_min", "end_min", "zone", "interval_sec", "next_due", "flags",
+                         "quiet_start", "quiet_end"):
+                column = getattr(self, name)
+                column[row] = column[last]
+            self._index[int(self.user_ids[row])] = row
+        self.size = last
+
+    def zone_keys(self, user_ids: Iterable[int]) -> List[str]:
+        """用户对应的 IANA 时区名（供批量 SQL 计算本地日界线）"""
+        return [zone_key(self._zones[self.zone[self._index[uid]]]) for uid in user_ids]
+
+    # ==================== 向量化计算 ====================
+
+    def local_minutes(self, now: datetime) -> np.ndarray:
+        """所有用户当前的本地分钟数（0 ~ 1439）"""
+        n = self.size
+        zone_offsets = np.asarray(utc_offsets_bulk(self._zones, now), dtype=np.int64)
+        now_ts = _to_epoch(now)
+        offsets = zone_offsets[self.zone[:n]] if len(zone_offsets) else np.zeros(n, dtype=np.int64)
+        return ((now_ts + offsets) // 60) % (24 * 60)
+
+    def eligible_mask(self, now: datetime) -> np.ndarray:
+        """计算“已到期且应当提醒”的布尔掩码"""
+        n = self.size
+        if n == 0:
+            return np.zeros(0, dtype=bool)
+        now_ts = _to_epoch(now)
+        minutes = self.local_minutes(now)
+
+        start = self.start_min[:n]
+        end = self.end_min[:n]
+        # 活跃时段：普通区间 [start, end)；跨越午夜（start >= end）时为 [start, 24h) ∪ [0, end)
+        in_window = np.where(
+            start < end,
+            (minutes >= start) & (minutes < end),
+            (minutes >= start) | (minutes < end),
+        )
+
+        # 免打扰时段：任一槽位满足 start <= m <= end
+        qs = self.quiet_start[:n]
+        qe = self.quiet_end[:n]
+        m = minutes[:, None]
+        quiet = ((qs >= 0) & (qs <= m) & (m <= qe)).any(axis=1)
+
+        return (
+            (self.flags[:n] == 0)
+            & (self.next_due[:n] <= now_ts)
+            & in_window
+            & ~quiet
+        )
+
+    def due(self, now: Optional[datetime] = None) -> np.ndarray:
+        """返回本周期应当提醒的用户 ID 数组"""
+        now = now or datetime.utcnow()
+        return self.user_ids[:self.size][self.eligible_mask(now)]
+
+    def mark_sent(self, user_ids: Iterable[int], now: Optional[datetime] = None):
+        """批量设置已提醒用户的下次到期时间 = now + 间隔"""
+        rows = np.fromiter((self._index[uid] for uid in user_ids if uid in self._index), dtype=np.int64)
+        if len(rows):
+            self.next_due[rows] = _to_epoch(now or datetime.utcnow()) + self.interval_sec[rows]
@@ -0,0 +1,120 @@
+"""
+数据导出模块 (export.py)
+把用户的全部饮水历史流式写入 gzip 压缩的 CSV 或 JSON Lines 临时文件，
+记录通过服务端游标逐批读取、逐块写入，内存占用不随记录数增长。
+
+已归档（见 retention.py）的日期只剩每日汇总，导出为 type=daily_total 的行；
+其余为 type=record 的原始记录。
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Tuple
+
+from config import EXPORT_CHUNK_ROWS, EXPORT_COOLDOWN_SECONDS
+from timezones import TimezoneSpec, to_local
+
+EXPORT_FORMATS = ("csv", "jsonl")
+CSV_COLUMNS = ("type", "date", "local_time", "amount", "drinks", "created_at_utc")
+
+# Telegram Bot API 发送文件的大小上限
+TELEGRAM_DOCUMENT_LIMIT = 50 * 1024 * 1024
+
+# 用户最近一次导出的时间（monotonic）
+_last_export: Dict[int, float] = {}
+
+
+def cooldown_remaining(user_id: int) -> int:
+    """距离该用户下次可以导出还需等待的秒数（0 表示可以导出）"""
+    last = _last_export.get(user_id)
+    if last is None:
+        return 0
+    return max(0, int(EXPORT_COOLDOWN_SECONDS - (time.monotonic() - last)))
+
+
+def mark_exported(user_id: int):
+    _last_export[user_id] = time.monotonic()
+
+
+class _RowEncoder:
+    """把导出行编码为 CSV 或 JSON Lines 文本"""
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer) if fmt == "csv" else None
+
+    def header(self) -> str:
+        if self._csv is None:
+            return ""
+        self._csv.writerow(CSV_COLUMNS)
+        return self._take()
+
+    def encode(self, row: Dict) -> str:
+        if self._csv is None:
+            return json.dumps(row, ensure_ascii=False) + "\n"
+        self._csv.writerow([row.get(column, "") for column in CSV_COLUMNS])
+        return self._take()
+
+    def _take(self) -> str:
+        text = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return text
+
+
+async def export_user_history(db, user_id: int, timezone: TimezoneSpec, fmt: str = "csv") -> Tuple[str, int]:
+    """导出用户全部饮水历史到临时文件
+
+    Returns:
+        (文件路径, 导出行数)；文件由调用方发送后删除
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+
+    fd, path = tempfile.mkstemp(prefix=f"export_{user_id}_", suffix=f".{fmt}.gz")
+    os.close(fd)
+    encoder = _RowEncoder(fmt)
+    count = 0
+    try:
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as fh:
+            chunk = [encoder.header()]
+
+            # 已归档日期的每日汇总（每个日期一行，数量有限）
+            for total in await db.get_daily_totals(user_id):
+                chunk.append(encoder.encode({
+                    "type": "daily_total",
+                    "date": total["day"].isoformat(),
+                    "amount": total["total"],
+                    "drinks": total["drinks"],
+                }))
+                count += 1
+
+            # 原始记录：游标逐批读取，每 EXPORT_CHUNK_ROWS 行在线程中写一次
+            async for record in db.iter_user_records(user_id, prefetch=EXPORT_CHUNK_ROWS):
+                local = to_local(record["created_at"], timezone)
+                chunk.append(encoder.encode({
+                    "type": "record",
+                    "date": local.date().isoformat(),
+                    "local_time": local.strftime("%H:%M:%S"),
+                    "amount": record["amount"],
+                    "drinks": 1,
+                    "created_at_utc": record["created_at"].isoformat(),
+                }))
+                count += 1
+                if len(chunk) >= EXPORT_CHUNK_ROWS:
+                    await asyncio.to_thread(fh.write, "".join(chunk))
+                    chunk = []
+
+            if chunk:
+                await asyncio.to_thread(fh.write, "".join(chunk))
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, count
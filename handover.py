@@ -0,0 +1,142 @@
+"""
+滚动重启交接模块 (handover.py)
+新旧两个进程在滚动部署时短暂共存，交接模式（HANDOVER_MODE）下：
+
+- 轮询租约（runtime_state['poller']）保证同一时刻只有一个进程调用 getUpdates，
+  新进程等待旧进程释放租约（或租约心跳超时）后才开始轮询，不会出现 409 冲突；
+- UpdateTracker 记录已接收的最大 update_id 和正在处理的更新数，
+  旧进程停止轮询后等待处理中的更新完成，把下一个 offset 连同调度状态写入
+  runtime_state['handover']，新进程从该 offset 继续接收，停机期间的消息不会被丢弃。
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+logger = logging.getLogger(__name__)
+
+POLLER_LEASE_KEY = "poller"
+HANDOVER_STATE_KEY = "handover"
+
+
+class UpdateTracker(BaseMiddleware):
+    """Update 外层中间件：统计已接收的最大 update_id 和正在处理的更新数
+
+    skip_below 为交接得到的 offset，低于它的更新已由旧进程处理过，直接跳过（防御性检查，
+    正常情况下确认 offset 之后 Telegram 不会再下发这些更新）。
+    """
+
+    def __init__(self, on_handled: Optional[Callable[[], None]] = None):
+        self.last_update_id: Optional[int] = None
+        self.skip_below: Optional[int] = None
+        self.in_flight = 0
+        self.handled = 0
+        self.skipped = 0
+        self._on_handled = on_handled
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+        if self.skip_below is not None and event.update_id < self.skip_below:
+            self.skipped += 1
+            return None
+        if self.last_update_id is None or event.update_id > self.last_update_id:
+            self.last_update_id = event.update_id
+
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            return await handler(event, data)
+        finally:
+            self.in_flight -= 1
+            self.handled += 1
+            if self.in_flight == 0:
+                self._idle.set()
+            if self._on_handled:
+                self._on_handled()
+
+    @property
+    def next_offset(self) -> Optional[int]:
+        """下一次 getUpdates 应使用的 offset（尚未收到任何更新时为 None）"""
+        return self.last_update_id + 1 if self.last_update_id is not None else None
+
+    async def drain(self, timeout: float) -> bool:
+        """等待正在处理的更新全部完成，超时返回 False"""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "last_update_id": self.last_update_id,
+            "in_flight": self.in_flight,
+            "handled": self.handled,
+            "skipped": self.skipped,
+        }
+
+
+class PollerLease:
+    """轮询租约：持有者定期刷新心跳，超过 ttl 未刷新视为持有进程已崩溃"""
+
+    def __init__(self, db, heartbeat_seconds: float):
+        self.db = db
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.heartbeat_seconds = heartbeat_seconds
+        self.ttl = heartbeat_seconds * 3
+        self._task: Optional[asyncio.Task] = None
+
+    async def wait_for_release(self, timeout: float) -> bool:
+        """等待其他进程释放租约；租约过期视为已释放，等待超时返回 False"""
+        deadline = time.monotonic() + timeout
+        logged = False
+        while True:
+            state = await self.db.get_runtime_state(POLLER_LEASE_KEY)
+            if state is None or state["value"].get("owner") == self.owner:
+                return True
+            if state["age"] > self.ttl:
+                logger.warning(f"[交接] 轮询租约已过期 ({state['age']:.0f}s 未刷新, 持有者 "
+                               f"{state['value'].get('owner')})，直接接管")
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            if not logged:
+                logger.info(f"[交接] 等待旧进程 {state['value'].get('owner')} 交出轮询...")
+                logged = True
+            await asyncio.sleep(0.5)
+
+    async def claim(self):
+        """持有租约并开始刷新心跳"""
+        await self.db.set_runtime_state(POLLER_LEASE_KEY, {"owner": self.owner})
+        if self._task is None:
+            self._task = asyncio.create_task(self._heartbeat())
+        logger.info(f"[交接] 已持有轮询租约 ({self.owner})")
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                if not await self.db.touch_runtime_state(POLLER_LEASE_KEY, self.owner):
+                    logger.warning("[交接] 轮询租约已被其他进程接管")
+            except Exception as e:
+                logger.warning(f"[交接] 刷新轮询租约失败: {e}")
+
+    async def release(self):
+        """停止心跳并释放租约（只删除自己持有的租约）"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.db.delete_runtime_state(POLLER_LEASE_KEY, owner=self.owner)
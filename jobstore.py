@@ -0,0 +1,170 @@
+"""
+持久化定时任务存储模块 (jobstore.py)
+APScheduler 的 job store 接口是同步的，而数据库访问走 asyncpg。PostgresJobStore：
+
+- 以 MemoryJobStore 为内存索引，调度器的查询（到期 Job、下次唤醒时间）都不访问数据库；
+- 新增 / 修改 / 删除 Job 时立即序列化（不可序列化的 Job 在 add_job 时就报错，与其他持久化 store 一致），
+  记入待写集合，后台协程每隔 flush_interval 秒把同一 Job 的多次变更合并后单事务批量写入 scheduler_jobs 表；
+- 启动时 load() 用一次查询取回全部 Job，调度器启动时（start）直接还原进内存索引，
+  无法还原的 Job（例如引用的函数已改名）记录日志后删除；
+- 关闭时 flush() 写出剩余变更；调度器关闭时清空内存索引不会删除数据库中的 Job。
+"""
+
+import asyncio
+import logging
+import pickle
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from apscheduler.job import Job
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.util import datetime_to_utc_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresJobStore(MemoryJobStore):
+    """内存索引 + 批量写回 Postgres 的 APScheduler job store"""
+
+    def __init__(self, db, flush_interval: float = 2.0, pickle_protocol: int = pickle.HIGHEST_PROTOCOL):
+        super().__init__()
+        self.db = db
+        self.flush_interval = flush_interval
+        self.pickle_protocol = pickle_protocol
+        # job_id -> (next_run_time 时间戳, 序列化后的状态)；None 表示待删除
+        self._dirty: Dict[str, Optional[Tuple[Optional[float], bytes]]] = {}
+        self._loaded: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self.stats = {"loaded": 0, "load_ms": 0.0, "broken": 0, "flushes": 0, "written": 0, "errors": 0}
+
+    # ==================== 加载 ====================
+
+    async def load(self):
+        """启动前一次查询取回全部持久化的 Job（在调度器 start 之前调用）"""
+        started = time.perf_counter()
+        self._loaded = await self.db.load_scheduler_jobs()
+        self.stats["load_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"[调度] 已从数据库读取 {len(self._loaded)} 个持久化 Job ({self.stats['load_ms']}ms)")
+
+    def start(self, scheduler, alias):
+        super().start(scheduler, alias)
+        rows, self._loaded = self._loaded, []
+        for row in rows:
+            try:
+                job = self._reconstitute_job(row["job_state"])
+            except Exception as e:
+                self.stats["broken"] += 1
+                self._dirty[row["id"]] = None
+                logger.warning(f"[调度] ⚠️ 无法还原持久化 Job {row['id']}，已删除: {e}")
+                continue
+            # 直接写入内存索引，不产生待写记录
+            MemoryJobStore.add_job(self, job)
+        self.stats["loaded"] = len(self._jobs)
+
+    def _reconstitute_job(self, job_state: bytes) -> Job:
+        state = pickle.loads(job_state)
+        state["jobstore"] = self
+        job = Job.__new__(Job)
+        job.__setstate__(state)
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    # ==================== 变更记录 ====================
+
+    def _serialize(self, job: Job) -> Tuple[Optional[float], bytes]:
+        return datetime_to_utc_timestamp(job.next_run_time), pickle.dumps(job.__getstate__(), self.pickle_protocol)
+
+    def _notify(self):
+        if self._wakeup is not None and len(self._dirty) >= 1000:
+            # 大量变更（例如批量恢复调度）时不等到下个周期
+            self._wakeup.set()
+
+    def add_job(self, job: Job):
+        # 先序列化：不可序列化的 Job 不进入内存索引
+        entry = self._serialize(job)
+        super().add_job(job)
+        self._dirty[job.id] = entry
+        self._notify()
+
+    def update_job(self, job: Job):
+        super().update_job(job)
+        self._dirty[job.id] = self._serialize(job)
+        self._notify()
+
+    def remove_job(self, job_id: str):
+        super().remove_job(job_id)
+        self._dirty[job_id] = None
+        self._notify()
+
+    def remove_all_jobs(self):
+        for job_id in list(self._jobs_index):
+            self._dirty[job_id] = None
+        super().remove_all_jobs()
+        self._notify()
+
+    def shutdown(self):
+        # 调度器关闭：只清空内存索引，数据库中的 Job 保留给下次启动
+        MemoryJobStore.remove_all_jobs(self)
+
+    # ==================== 写回 ====================
+
+    def start_flusher(self):
+        """在事件循环中调用：启动后台写回协程"""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._flush_loop(), name="job_store_flush")
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """把待写变更合并写入数据库，返回写入的 Job 数；失败时保留变更等待下次重试"""
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = self._dirty, {}
+        upserts = [(job_id, entry[0], entry[1]) for job_id, entry in dirty.items() if entry is not None]
+        deletes = [job_id for job_id, entry in dirty.items() if entry is None]
+        try:
+            await self.db.save_scheduler_jobs(upserts, deletes)
+        except asyncio.CancelledError:
+            self._restore_dirty(dirty)
+            raise
+        except Exception as e:
+            self._restore_dirty(dirty)
+            self.stats["errors"] += 1
+            logger.warning(f"[调度] ⚠️ 持久化 {len(dirty)} 个 Job 变更失败，稍后重试: {e}")
+            return 0
+        self.stats["flushes"] += 1
+        self.stats["written"] += len(dirty)
+        return len(dirty)
+
+    def _restore_dirty(self, dirty: Dict[str, Optional[Tuple[Optional[float], bytes]]]):
+        # 写入期间产生的新变更优先
+        for job_id, entry in dirty.items():
+            self._dirty.setdefault(job_id, entry)
+
+    async def stop(self):
+        """停止后台写回协程并写出剩余变更（在调度器关闭之后、数据库关闭之前调用）"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        written = await self.flush()
+        if self._dirty:
+            logger.error(f"[关闭] ❌ {len(self._dirty)} 个 Job 变更未能写入数据库")
+        elif written:
+            logger.info(f"[关闭] ✅ 已写出 {written} 个 Job 变更")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "jobs": len(self._jobs), "pending_writes": len(self._dirty)}
@@ -0,0 +1,192 @@
+"""
+群组排行榜模块 (leaderboard.py)
+群组成员的今日 / 本周饮水排行保存在内存中的有序榜单里：
+每个 (群组, 周期) 第一次被查看时从 daily_summary 汇总一次成员总量，
+之后每次有成员记录饮水只对该成员做一次 O(log n) 的定位和移动，
+查看排行榜不需要再聚合 records，大群也一样。
+
+日期按成员各自的本地日期计入（与 daily_summary 一致），周期边界按群组时区计算。
+"""
+
+import asyncio
+import bisect
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+PERIOD_DAY = "day"
+PERIOD_WEEK = "week"
+LEADERBOARD_PERIODS = (PERIOD_DAY, PERIOD_WEEK)
+
+BoardKey = Tuple[int, str]
+# (chat_id, 起始日期, 结束日期) -> [{"user_id", "display_name", "total"}]
+BoardLoader = Callable[[int, date, date], Awaitable[List[Dict]]]
+
+
+def period_bounds(period: str, today: date) -> Tuple[date, date]:
+    """周期的起止日期（含）：今天，或本周一 ~ 本周日"""
+    if period == PERIOD_WEEK:
+        start = today - timedelta(days=today.weekday())
+        return start, start + timedelta(days=6)
+    return today, today
+
+
+class RankedTotals:
+    """按总量降序排列的成员榜单
+
+    _keys 为有序的 (-total, user_id) 列表，更新一个成员时二分定位旧位置并插入新位置，
+    不需要重新排序整个榜单。
+    """
+
+    def __init__(self, totals: Optional[Dict[int, int]] = None):
+        self.totals: Dict[int, int] = dict(totals or {})
+        self._keys: List[Tuple[int, int]] = sorted((-total, user_id) for user_id, total in self.totals.items())
+
+    def __len__(self) -> int:
+        return len(self.totals)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self.totals
+
+    def set(self, user_id: int, total: int):
+        old = self.totals.get(user_id)
+        if old is not None:
+            del self._keys[bisect.bisect_left(self._keys, (-old, user_id))]
+        self.totals[user_id] = total
+        bisect.insort(self._keys, (-total, user_id))
+
+    def add(self, user_id: int, amount: int):
+        self.set(user_id, self.totals.get(user_id, 0) + amount)
+
+    def remove(self, user_id: int):
+        old = self.totals.pop(user_id, None)
+        if old is not None:
+            del self._keys[bisect.bisect_left(self._keys, (-old, user_id))]
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """成员名次（从 1 开始，总量相同的成员名次相同）"""
+        total = self.totals.get(user_id)
+        if total is None:
+            return None
+        return bisect.bisect_left(self._keys, (-total, float("-inf"))) + 1
+
+    def top(self, n: int) -> List[Tuple[int, int]]:
+        """前 n 名的 (user_id, total)"""
+        return [(user_id, -neg_total) for neg_total, user_id in self._keys[:n]]
+
+    def members(self) -> List[Tuple[int, int]]:
+        return self.top(len(self._keys))
+
+
+class GroupLeaderboards:
+    """所有群组的排行榜缓存（按需加载，随饮水记录增量更新）"""
+
+    def __init__(self, loader: BoardLoader):
+        self.loader = loader
+        self.names: Dict[int, str] = {}
+        self._boards: Dict[BoardKey, Tuple[date, date, RankedTotals]] = {}
+        self._by_user: Dict[int, Set[BoardKey]] = {}
+        self._loading: Dict[BoardKey, asyncio.Future] = {}
+        self._touched: Dict[BoardKey, bool] = {}
+        self.stats = {"loads": 0, "hits": 0, "updates": 0}
+
+    async def board(self, chat_id: int, period: str, today: date) -> RankedTotals:
+        """获取群组某个周期的榜单；周期已翻转或尚未加载时从 daily_summary 加载一次"""
+        key = (chat_id, period)
+        start, end = period_bounds(period, today)
+        cached = self._boards.get(key)
+        if cached and cached[0] == start:
+            self.stats["hits"] += 1
+            return cached[2]
+
+        pending = self._loading.get(key)
+        if pending is not None:
+            return await pending
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            board = await self._load(key, start, end)
+            future.set_result(board)
+            return board
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有其他等待者时避免 "Future exception was never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._loading.pop(key, None)
+
+    async def _load(self, key: BoardKey, start: date, end: date) -> RankedTotals:
+        chat_id, _period = key
+        # 加载期间有成员记录饮水时无法确定该次记录是否已包含在查询结果中，重新加载一次
+        for _ in range(2):
+            self._touched[key] = False
+            rows = await self.loader(chat_id, start, end)
+            if not self._touched.pop(key, False):
+                break
+        self.stats["loads"] += 1
+
+        self._drop(key)
+        board = RankedTotals({row["user_id"]: int(row["total"]) for row in rows})
+        for row in rows:
+            if row.get("display_name"):
+                self.names[row["user_id"]] = row["display_name"]
+            self._by_user.setdefault(row["user_id"], set()).add(key)
+        self._boards[key] = (start, end, board)
+        return board
+
+    def _drop(self, key: BoardKey):
+        cached = self._boards.pop(key, None)
+        if cached is None:
+            return
+        for user_id in cached[2].totals:
+            keys = self._by_user.get(user_id)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._by_user[user_id]
+
+    def record(self, user_id: int, day: date, amount: int):
+        """成员记录了一次饮水（day 为该成员的本地日期）：更新所有包含该日期的已加载榜单"""
+        # 正在加载的榜单不知道该用户是否为成员，保守地全部标记为需要重新加载（加载很少发生）
+        for key in self._touched:
+            self._touched[key] = True
+        for key in self._by_user.get(user_id, ()):
+            start, end, board = self._boards[key]
+            if start <= day <= end:
+                board.add(user_id, amount)
+                self.stats["updates"] += 1
+
+    def join(self, chat_id: int, user_id: int, display_name: str):
+        """成员加入群组：已加载的榜单需要重新加载才能包含该成员在本周期之前的记录"""
+        self.names[user_id] = display_name
+        for period in LEADERBOARD_PERIODS:
+            key = (chat_id, period)
+            board = self._boards.get(key)
+            if board is not None and user_id not in board[2]:
+                self._drop(key)
+            if key in self._touched:
+                self._touched[key] = True
+
+    def leave(self, chat_id: int, user_id: int):
+        for period in LEADERBOARD_PERIODS:
+            key = (chat_id, period)
+            cached = self._boards.get(key)
+            if cached is not None:
+                cached[2].remove(user_id)
+            keys = self._by_user.get(user_id)
+            if keys:
+                keys.discard(key)
+
+    def forget_user(self, user_id: int):
+        """用户数据被重置：丢弃包含该用户的榜单，下次查看时重新加载"""
+        for key in list(self._by_user.get(user_id, ())):
+            self._drop(key)
+        self._by_user.pop(user_id, None)
+
+    def forget_group(self, chat_id: int):
+        for period in LEADERBOARD_PERIODS:
+            self._drop((chat_id, period))
+
+    def summary(self) -> Dict[str, int]:
+        return {**self.stats, "boards": len(self._boards), "members": len(self._by_user)}
@@ -0,0 +1,217 @@
+"""
+日志管道模块 (logs.py)
+每次提醒、记录、调度都会写一条 INFO 日志，用户量大时直接同步写 stdout 会阻塞事件循环。
+setup_logging 把根日志器改为：
+
+- 调用方线程只做采样判断和消息拼接，然后把记录放进有界队列（QueueHandler），立即返回；
+- 后台线程（QueueListener）负责格式化并写入 stdout，输出为每行一个 JSON 对象（或传统文本格式）；
+- 按类别限速采样：类别取消息开头的 "[xxx]" 标签（没有标签时取日志器名），
+  每个类别按配置的条数/秒放行 INFO 及以下级别的日志，WARNING 及以上总是放行；
+  被丢弃的条数附加在该类别下一条放行的日志上（sampled_out），并通过 /status 暴露；
+- 队列满时丢弃新日志并计数，不阻塞调用方。
+"""
+
+import atexit
+import json
+import logging
+import queue
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+_CATEGORY_RE = re.compile(r"^\[([^\]]+)\]")
+
+LOG_FORMATS = ("json", "text")
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s: %(message)s"
+
+
+def record_category(record: logging.LogRecord) -> str:
+    """日志类别：消息开头的 "[xxx]" 标签，没有标签时为日志器名"""
+    category = getattr(record, "category", None)
+    if category is None:
+        msg = record.msg if isinstance(record.msg, str) else str(record.msg)
+        match = _CATEGORY_RE.match(msg)
+        category = match.group(1) if match else record.name
+        record.category = category
+    return category
+
+
+def parse_sample_rates(text: str) -> Dict[str, float]:
+    """解析 "提醒=10,调度=10" 格式的采样配置（每个类别每秒最多放行的 INFO 日志条数）"""
+    rates = {}
+    for item in (text or "").split(","):
+        if "=" not in item:
+            continue
+        category, _, rate = item.partition("=")
+        try:
+            rates[category.strip()] = float(rate)
+        except ValueError:
+            continue
+    return rates
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志输出为一行 JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "category": record_category(record),
+            "msg": record.getMessage(),
+        }
+        sampled_out = getattr(record, "sampled_out", 0)
+        if sampled_out:
+            entry["sampled_out"] = sampled_out
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """传统文本格式，附带采样丢弃的条数"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        sampled_out = getattr(record, "sampled_out", 0)
+        if sampled_out:
+            text += f" (另有 {sampled_out} 条同类日志被采样丢弃)"
+        return text
+
+
+class SamplingFilter(logging.Filter):
+    """按类别的令牌桶采样：每个配置了速率的类别每秒最多放行 rate 条 INFO/DEBUG 日志"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = dict(rates)
+        self._buckets: Dict[str, list] = {}  # category -> [tokens, last_refill]
+        self._pending: Dict[str, int] = {}  # 上一条放行之后被丢弃的条数
+        self.sampled_out: Dict[str, int] = {}  # 累计丢弃条数
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        category = record_category(record)
+        rate = self.rates.get(category)
+        if rate is None:
+            return True
+
+        with self._lock:
+            now = time.monotonic()
+            capacity = max(rate, 1.0)
+            bucket = self._buckets.get(category)
+            if bucket is None:
+                bucket = self._buckets[category] = [capacity, now]
+            else:
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] < 1.0:
+                self._pending[category] = self._pending.get(category, 0) + 1
+                self.sampled_out[category] = self.sampled_out.get(category, 0) + 1
+                return False
+            bucket[0] -= 1.0
+            dropped = self._pending.pop(category, 0)
+        if dropped:
+            record.sampled_out = dropped
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """写入有界队列的 QueueHandler：队列满时丢弃并计数，不阻塞调用方"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 在调用方线程拼好消息（参数对象可能随后被修改），异常堆栈转为文本，格式化留给后台线程
+        record_category(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if self._unreported:
+                notice = logging.makeLogRecord({
+                    "name": __name__,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": f"[日志] ⚠️ 日志队列已满，丢弃了 {self._unreported} 条日志",
+                })
+                self.queue.put_nowait(notice)
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+
+_state: Dict[str, Any] = {"listener": None, "handler": None, "output": None, "sampler": None, "format": None}
+
+
+def setup_logging(level: str = "INFO", fmt: str = "json",
+                  sample_rates: Optional[Dict[str, float]] = None, queue_size: int = 10000):
+    """把根日志器替换为 队列 → 后台线程 → stdout 的管道（重复调用时先停止旧管道）"""
+    stop_logging()
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(TextFormatter(TEXT_FORMAT) if fmt == "text" else JsonFormatter())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    handler = NonBlockingQueueHandler(log_queue)
+    sampler = SamplingFilter(sample_rates or {})
+    handler.addFilter(sampler)
+
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    listener = QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    _state.update(listener=listener, handler=handler, output=output, sampler=sampler, format=fmt)
+
+
+def stop_logging():
+    """停止后台线程并写出队列中剩余的日志（可重复调用）；之后的日志直接同步写出"""
+    listener = _state.get("listener")
+    if listener is None:
+        return
+    _state["listener"] = None
+    listener.stop()
+    root = logging.getLogger()
+    if _state["handler"] in root.handlers:
+        root.removeHandler(_state["handler"])
+        _state["output"].addFilter(_state["sampler"])
+        root.addHandler(_state["output"])
+
+
+def logging_stats() -> Dict[str, Any]:
+    handler = _state.get("handler")
+    sampler = _state.get("sampler")
+    if handler is None:
+        return {}
+    return {
+        "format": _state["format"],
+        "queued": handler.queue.qsize(),
+        "dropped": handler.dropped,
+        "sampled_out": dict(sampler.sampled_out) if sampler else {},
+    }
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,147 @@
+"""
+事件循环延迟监控模块 (looplag.py)
+轮询、APScheduler、HTTP 健康检查和所有数据库调用共用一个 asyncio 事件循环，
+任何一个回调同步执行太久，其余所有处理都会被推迟。LoopLagMonitor：
+
+- 采样协程每隔 interval 秒 sleep 一次，实际醒来时间比预期晚多少即为本次的循环延迟，
+  保留最近的样本计算 p50 / p99；
+- 看门狗线程检查采样协程的心跳，事件循环卡住超过 threshold 时直接抓取事件循环线程的当前调用栈
+  （也就是正在阻塞循环的那段代码）和当前任务名——循环恢复后再看已经来不及了；
+- 恢复后写一条 [事件循环] 告警日志，附带卡住期间抓到的调用栈，并通过 /status 暴露。
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 保留的延迟样本数（默认 0.5s 一次，约 8 分钟）
+LAG_SAMPLES = 1024
+# 两条卡顿告警日志的最短间隔（秒）
+STALL_LOG_INTERVAL = 10
+
+
+def _percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+class LoopLagMonitor:
+    """事件循环延迟采样器和卡顿看门狗"""
+
+    def __init__(self, interval: float = 0.5, threshold: float = 0.2):
+        self.interval = interval
+        self.threshold = threshold
+        self.samples: Deque[float] = deque(maxlen=LAG_SAMPLES)
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.last_stall: Optional[Dict[str, Any]] = None
+        self._beat = time.monotonic()
+        self._captured: Optional[Dict[str, Any]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._last_log = float("-inf")
+
+    def start(self):
+        """在事件循环中调用：启动采样协程和看门狗线程"""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._sample(), name="loop_lag_monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._beat = time.monotonic()
+            captured, self._captured = self._captured, None
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.threshold:
+                self._on_stall(lag, captured)
+
+    def _watch(self):
+        """看门狗线程：心跳超过 interval + threshold 未刷新时抓取事件循环线程的调用栈（每次卡顿一次）"""
+        check_every = max(0.01, self.threshold / 2)
+        while not self._stopped.wait(check_every):
+            stalled_for = time.monotonic() - self._beat
+            if stalled_for < self.interval + self.threshold or self._captured is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            try:
+                task = asyncio.current_task(self._loop)
+                task_name = task.get_name() if task is not None else None
+            except Exception:
+                task_name = None
+            self._captured = {
+                "task": task_name,
+                "stack": "".join(traceback.format_stack(frame, limit=25)),
+            }
+
+    def _on_stall(self, lag: float, captured: Optional[Dict[str, Any]]):
+        self.stalls += 1
+        self.last_stall = {
+            "at": time.time(),
+            "lag_ms": round(lag * 1000, 1),
+            "task": captured["task"] if captured else None,
+            "stack": captured["stack"] if captured else None,
+        }
+        now = time.monotonic()
+        if now - self._last_log < STALL_LOG_INTERVAL:
+            return
+        self._last_log = now
+        if captured:
+            logger.warning(f"[事件循环] ⚠️ 事件循环被阻塞 {lag * 1000:.0f}ms (任务 {captured['task']})，"
+                           f"阻塞时的调用栈:\n{captured['stack']}")
+        else:
+            logger.warning(f"[事件循环] ⚠️ 事件循环延迟 {lag * 1000:.0f}ms (累计 {self.stalls} 次超过阈值)")
+
+    def reset(self):
+        self.samples.clear()
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.last_stall = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        last_stall = dict(self.last_stall) if self.last_stall else None
+        return {
+            "loop": type(self._loop).__module__ + "." + type(self._loop).__name__ if self._loop else None,
+            "samples": len(ordered),
+            "p50_ms": round(_percentile(ordered, 0.5) * 1000, 2),
+            "p99_ms": round(_percentile(ordered, 0.99) * 1000, 2),
+            "max_ms": round(self.max_lag * 1000, 2),
+            "threshold_ms": round(self.threshold * 1000, 1),
+            "stalls": self.stalls,
+            "last_stall": last_stall,
+        }
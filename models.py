@@ -0,0 +1,49 @@
+"""
+ORM 模型模块 (models.py)
+users / records 两张表的 SQLAlchemy 声明式模型，仅供离线脚本和数据库工具参考使用。
+
+运行时所有查询都通过 asyncpg 直接执行（见 database.py），机器人进程不导入本模块，
+启动时也就不需要加载 SQLAlchemy。
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
+
+Base = declarative_base()
+
+
+# ==================== 数据库模型 ====================
+
+class User(Base):
+    """用户配置表"""
+    __tablename__ = "users"
+    
+    user_id = Column(Integer, primary_key=True)  # Telegram 用户 ID
+    daily_goal = Column(Integer, default=2500)  # 每日目标饮水量 (ml)
+    interval_min = Column(Integer, default=60)  # 提醒间隔 (分钟)
+    start_time = Column(String(5), default="08:00")  # 活跃时段开始
+    end_time = Column(String(5), default="22:00")  # 活跃时段结束
+    timezone = Column(Integer, default=8)  # 时区偏移 (如 +8)
+    last_remind_time = Column(DateTime, nullable=True)  # 上一次提醒时间 (UTC)
+    last_interaction_time = Column(DateTime, default=datetime.utcnow)  # 上一次交互时间（用于检测过期用户）
+    is_disabled = Column(Integer, default=0)  # 是否禁用提醒（1 = 禁用，0 = 启用）
+    created_at = Column(DateTime, default=datetime.utcnow)  # 账户创建时间
+    
+    # 关系映射
+    records = relationship("Record", back_populates="user", cascade="all, delete-orphan")
+
+
+class Record(Base):
+    """饮水记录表"""
+    __tablename__ = "records"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)  # 记录 ID
+    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)  # 用户 ID
+    amount = Column(Integer, nullable=False)  # 饮水量 (ml)
+    created_at = Column(DateTime, default=datetime.utcnow)  # 记录时间 (UTC)
+    
+    # 关系映射
+    user = relationship("User", back_populates="records")
@@ -0,0 +1,141 @@
+"""
+发件箱模块 (outbox.py)
+定时任务只负责把渲染好的消息写入 outbox 表，本模块的发送协程池
+通过 FOR UPDATE SKIP LOCKED 领取消息并投递到 Telegram，失败按指数退避重试。
+调度吞吐量因此不再受 Telegram 接口延迟影响。
+按消息种类附加的键盘（例如提醒下方的一键记录按钮）在投递时加上，不写入 outbox 表。
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+
+from config import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_LEASE_SECONDS,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_POLL_INTERVAL,
+    OUTBOX_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+# 重试退避：5s, 10s, 20s ... 最长 10 分钟
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 600
+
+
+def is_unreachable_error(error: Exception) -> bool:
+    """发送失败是否说明该会话已无法联系（用户屏蔽了机器人、账号已注销、会话不存在）"""
+    if isinstance(error, TelegramForbiddenError):
+        return True
+    return isinstance(error, TelegramBadRequest) and "chat not found" in str(error).lower()
+
+
+def retry_delay(attempts: int) -> float:
+    """第 attempts 次投递失败后的重试等待时间（秒）"""
+    return min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+
+
+class OutboxDispatcher:
+    """发件箱发送协程池"""
+
+    def __init__(self, bot: Bot, db, workers: int = OUTBOX_WORKERS, batch_size: int = OUTBOX_BATCH_SIZE,
+                 on_unreachable: Optional[Callable[[int], Awaitable[None]]] = None,
+                 reply_markups: Optional[Dict[str, Any]] = None):
+        self.bot = bot
+        self.db = db
+        self.workers = workers
+        self.batch_size = batch_size
+        # 收件人无法联系时的回调（停止该用户的全部调度）
+        self.on_unreachable = on_unreachable
+        # 消息种类 -> 投递时附加的 reply_markup
+        self.reply_markups = reply_markups or {}
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {"sent": 0, "retried": 0, "failed": 0, "unreachable": 0}
+
+    def notify(self):
+        """有新消息入队时唤醒空闲的发送协程"""
+        self._wakeup.set()
+
+    def start(self):
+        """启动发送协程池"""
+        if self._tasks:
+            return
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._worker(n), name=f"outbox-worker-{n}")
+            for n in range(self.workers)
+        ]
+        logger.info(f"[发件箱] ✅ 已启动 {self.workers} 个发送协程")
+
+    async def stop(self):
+        """停止发送协程池（等待正在发送的批次完成）"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("[发件箱] 发送协程已停止")
+
+    async def _worker(self, n: int):
+        while not self._stopping:
+            try:
+                batch = await self.db.claim_outbox(self.batch_size, OUTBOX_LEASE_SECONDS)
+            except Exception as e:
+                logger.error(f"[发件箱] 领取消息失败: {e}")
+                batch = []
+
+            if not batch:
+                # 没有到期消息：等待新消息入队或轮询间隔到期
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=OUTBOX_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            for item in batch:
+                try:
+                    if await self._deliver(item):
+                        # 逐条标记：批次中途崩溃或租约到期时，已发出的消息不会被重新领取、重复发送
+                        await self.db.mark_outbox_sent(item["id"])
+                except Exception as e:
+                    # 状态写回失败：租约到期后重新领取（至少一次投递）
+                    logger.error(f"[发件箱] 处理消息 {item['id']} 失败: {e}")
+
+    async def _deliver(self, item: Dict[str, Any]) -> bool:
+        """投递单条消息，返回是否成功；失败时安排重试或标记永久失败"""
+        try:
+            await self.bot.send_message(
+                item["user_id"], item["text"], parse_mode=item["parse_mode"],
+                reply_markup=self.reply_markups.get(item["kind"])
+            )
+            self.stats["sent"] += 1
+            return True
+        except TelegramRetryAfter as e:
+            # Telegram 限流：按服务端要求的时间后重试，不计入失败
+            await self.db.mark_outbox_retry(item["id"], e.retry_after, str(e))
+            self.stats["retried"] += 1
+        except (TelegramForbiddenError, TelegramBadRequest) as e:
+            # 用户屏蔽了机器人 / 会话不存在等，重试无意义
+            await self.db.mark_outbox_failed(item["id"], str(e))
+            self.stats["failed"] += 1
+            logger.warning(f"[发件箱] 消息 {item['id']} 无法投递给用户 {item['user_id']}: {e}")
+            if is_unreachable_error(e) and self.on_unreachable is not None:
+                self.stats["unreachable"] += 1
+                await self.on_unreachable(item["user_id"])
+        except Exception as e:
+            if item["attempts"] >= OUTBOX_MAX_ATTEMPTS:
+                await self.db.mark_outbox_failed(item["id"], str(e))
+                self.stats["failed"] += 1
+                logger.error(f"[发件箱] 消息 {item['id']} 重试 {item['attempts']} 次后放弃: {e}")
+            else:
+                await self.db.mark_outbox_retry(item["id"], retry_delay(item["attempts"]), str(e))
+                self.stats["retried"] += 1
+        return False
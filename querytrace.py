@@ -0,0 +1,196 @@
+"""
+查询追踪模块 (querytrace.py)
+按 (DatabaseManager 方法, SQL 指纹) 汇总每条查询的调用次数、总耗时和耗时分位数、返回行数、
+以及执行前等待连接池的时间，用来找出占用数据库时间最多的方法。
+
+- SQL 指纹：压缩空白、把字面量替换为 ?，同一条语句的不同参数归为一类；
+- 超过阈值的查询写入慢查询日志（[慢查询] 标签，参数只保留类型和长度），并保留最近若干条；
+- 可选地对慢的只读查询抽样执行一次 EXPLAIN (ANALYZE)（每个指纹有冷却时间），计划附在慢查询记录上。
+"""
+
+import logging
+import re
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 每个 (方法, 指纹) 保留最近多少次耗时用于计算分位数
+LATENCY_SAMPLES = 512
+# 保留的慢查询记录数
+SLOW_LOG_SIZE = 100
+# 同一指纹两次 EXPLAIN 的最短间隔（秒）
+EXPLAIN_COOLDOWN = 600
+
+SORT_KEYS = ("total", "p95", "calls", "rows", "wait")
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_SPACE_RE = re.compile(r"\s+")
+_READ_ONLY_RE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_WRITE_RE = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE|ALTER|CREATE|DROP)\b", re.IGNORECASE)
+
+
+def fingerprint(sql: str) -> str:
+    """SQL 指纹：压缩空白，字符串和数字字面量替换为 ?（$1 等占位符保留）"""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def redact(args: Tuple[Any, ...]) -> List[str]:
+    """参数脱敏：只保留类型（和字符串 / 列表的长度）"""
+    redacted = []
+    for arg in args:
+        if arg is None:
+            redacted.append("NULL")
+        elif isinstance(arg, (str, bytes, list, tuple)):
+            redacted.append(f"<{type(arg).__name__}:{len(arg)}>")
+        else:
+            redacted.append(f"<{type(arg).__name__}>")
+    return redacted
+
+
+def rows_of(result: Any, status: bool = False) -> int:
+    """查询结果的行数：fetch 为列表长度，execute 取状态字符串末尾的计数（"UPDATE 5"），单行 / 单值为 1"""
+    if status:
+        tail = str(result or "").rsplit(" ", 1)[-1]
+        return int(tail) if tail.isdigit() else 0
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _QueryStats:
+    __slots__ = ("calls", "errors", "total_ms", "max_ms", "rows", "wait_ms", "samples")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.wait_ms = 0.0
+        self.samples: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+
+class QueryTracer:
+    """查询耗时统计和慢查询日志"""
+
+    def __init__(self, enabled: bool = True, slow_ms: float = 200, explain: bool = False):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.since = time.time()
+        self._stats: Dict[Tuple[str, str], _QueryStats] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._explained: Dict[str, float] = {}
+        self.slow_log: Deque[Dict[str, Any]] = deque(maxlen=SLOW_LOG_SIZE)
+
+    def fingerprint(self, sql: str) -> str:
+        # 查询语句大多是常量字符串，缓存指纹避免每次都跑正则
+        fp = self._fingerprints.get(sql)
+        if fp is None:
+            if len(self._fingerprints) >= 4096:
+                self._fingerprints.clear()
+            fp = self._fingerprints[sql] = fingerprint(sql)
+        return fp
+
+    def record(self, method: str, sql: str, elapsed: float, rows: int, wait: float,
+               query_class: str, args: Tuple[Any, ...], error: Optional[BaseException] = None) -> Optional[Dict[str, Any]]:
+        """记录一次查询；慢查询返回其日志条目（调用方据此决定是否抽样 EXPLAIN）"""
+        fp = self.fingerprint(sql)
+        key = (method, fp)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _QueryStats()
+        elapsed_ms = elapsed * 1000
+        stats.calls += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        stats.rows += rows
+        stats.wait_ms += wait * 1000
+        stats.samples.append(elapsed_ms)
+        if error is not None:
+            stats.errors += 1
+
+        if elapsed_ms < self.slow_ms:
+            return None
+        entry = {
+            "at": time.time(),
+            "method": method,
+            "query_class": query_class,
+            "ms": round(elapsed_ms, 1),
+            "wait_ms": round(wait * 1000, 1),
+            "rows": rows,
+            "sql": fp,
+            "params": redact(args),
+            "error": type(error).__name__ if error is not None else None,
+            "plan": None,
+        }
+        self.slow_log.append(entry)
+        logger.warning(f"[慢查询] {method} 耗时 {entry['ms']}ms (等待连接 {entry['wait_ms']}ms, "
+                       f"{rows} 行, {query_class}) 参数 {entry['params']}: {fp[:300]}")
+        return entry
+
+    def should_explain(self, sql: str) -> bool:
+        """是否对这条慢查询抽样 EXPLAIN (ANALYZE)：只读查询，且该指纹不在冷却期内"""
+        if not self.explain or not _READ_ONLY_RE.match(sql) or _WRITE_RE.search(sql):
+            return False
+        fp = self.fingerprint(sql)
+        now = time.monotonic()
+        if now - self._explained.get(fp, float("-inf")) < EXPLAIN_COOLDOWN:
+            return False
+        self._explained[fp] = now
+        return True
+
+    def top(self, n: int = 10, sort: str = "total") -> List[Dict[str, Any]]:
+        """按总耗时 / p95 / 调用次数 / 行数 / 连接等待排序的前 n 项"""
+        rows = []
+        for (method, fp), stats in self._stats.items():
+            samples = sorted(stats.samples)
+            rows.append({
+                "method": method,
+                "sql": fp,
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "total_ms": round(stats.total_ms, 1),
+                "avg_ms": round(stats.total_ms / stats.calls, 2),
+                "p50_ms": round(_percentile(samples, 0.5), 2),
+                "p95_ms": round(_percentile(samples, 0.95), 2),
+                "p99_ms": round(_percentile(samples, 0.99), 2),
+                "max_ms": round(stats.max_ms, 2),
+                "rows": stats.rows,
+                "wait_ms": round(stats.wait_ms, 1),
+            })
+        field = {"total": "total_ms", "p95": "p95_ms", "calls": "calls", "rows": "rows", "wait": "wait_ms"}[sort]
+        rows.sort(key=lambda row: row[field], reverse=True)
+        return rows[:n]
+
+    def reset(self):
+        self._stats.clear()
+        self.slow_log.clear()
+        self.since = time.time()
+
+    def summary(self) -> Dict[str, Any]:
+        total_ms = sum(stats.total_ms for stats in self._stats.values())
+        return {
+            "enabled": self.enabled,
+            "slow_ms": self.slow_ms,
+            "explain": self.explain,
+            "since": self.since,
+            "queries": sum(stats.calls for stats in self._stats.values()),
+            "total_ms": round(total_ms, 1),
+            "fingerprints": len(self._stats),
+            "slow": len(self.slow_log),
+        }
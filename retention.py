@@ -0,0 +1,97 @@
+"""
+数据保留模块 (retention.py)
+超过保留期的原始饮水记录先写入本地按月分区的 CSV.gz 归档文件，
+再按批删除并汇总到 daily_totals（每个用户每个本地日期一行）。
+records 表因此只保留最近的数据，统计查询自动合并汇总表和原始记录。
+
+归档目录结构:
+    ARCHIVE_DIR/records/2026-01/records_<首条 id>_<末条 id>.csv.gz
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from config import ARCHIVE_DIR, RETENTION_BATCH_SIZE, RETENTION_DAYS, RETENTION_MAX_BATCHES
+from timezones import to_local
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = ("id", "user_id", "amount", "created_at")
+
+
+def write_archive(rows: List[Dict[str, Any]], archive_dir: str = ARCHIVE_DIR) -> List[str]:
+    """把一批记录按 UTC 月份写入 CSV.gz 文件，返回写入的文件路径
+
+    先写临时文件并 fsync，再原子重命名。文件名由批内 id 范围决定，
+    删除失败后重跑同一批会覆盖同名文件，不会产生重复归档。
+    """
+    by_month: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        by_month[row["created_at"].strftime("%Y-%m")].append(row)
+
+    paths = []
+    for month, month_rows in sorted(by_month.items()):
+        directory = os.path.join(archive_dir, "records", month)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"records_{month_rows[0]['id']}_{month_rows[-1]['id']}.csv.gz")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as gz, \
+                    io.TextIOWrapper(gz, encoding="utf-8", newline="") as text:
+                writer = csv.writer(text)
+                writer.writerow(ARCHIVE_COLUMNS)
+                for row in month_rows:
+                    writer.writerow([row["id"], row["user_id"], row["amount"], row["created_at"].isoformat()])
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_path, path)
+        paths.append(path)
+    return paths
+
+
+async def run_retention(db, days: int = RETENTION_DAYS, batch_size: int = RETENTION_BATCH_SIZE,
+                        max_batches: int = RETENTION_MAX_BATCHES, archive_dir: str = ARCHIVE_DIR) -> Dict[str, int]:
+    """归档并汇总早于 days 天的原始记录
+
+    每批：取记录 → 写归档文件（线程池中执行，不阻塞事件循环）→ 删除并累加到 daily_totals。
+    每次运行最多处理 max_batches 批，剩余的留给下一次运行。
+
+    Returns:
+        {"batches", "archived", "files"}
+    """
+    result = {"batches": 0, "archived": 0, "files": 0}
+    if days <= 0:
+        return result
+    # 至少保留 2 天，保证“今天”（任意时区）的记录始终是原始数据
+    days = max(days, 2)
+
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    for _ in range(max_batches):
+        rows = await db.fetch_records_before(cutoff, batch_size)
+        if not rows:
+            break
+
+        paths = await asyncio.to_thread(write_archive, rows, archive_dir)
+        local_days = [
+            to_local(row["created_at"], row["tz_name"] or row["timezone"] or 0).date()
+            for row in rows
+        ]
+        moved = await db.rollup_records([row["id"] for row in rows], local_days)
+
+        result["batches"] += 1
+        result["archived"] += moved
+        result["files"] += len(paths)
+        if len(rows) < batch_size:
+            break
+
+    if result["batches"]:
+        logger.info(f"[归档] 已归档并汇总 {result['archived']} 条 {days} 天前的记录 "
+                    f"({result['batches']} 批, {result['files']} 个文件)")
+    return result
@@ -0,0 +1,120 @@
+"""
+更新排序模块 (sequencer.py)
+aiogram 把每条更新作为独立任务并发处理：同一用户快速连发 "200"、"300" 时两个处理器会同时运行，
+交错地读取今日总量、重建同一个提醒 Job。UpdateSequencer 作为 Update 外层中间件：
+
+- 同一用户（没有发送者时按会话）的更新按到达顺序逐条处理；
+- 不同用户的更新并发处理，同时运行的处理器数不超过 limit，突发流量下吞吐量可预期；
+- 统计排队深度和等待时间，通过 /status 暴露。
+
+asyncio.Lock 按先来先得的顺序唤醒等待者，轮询循环按 update_id 顺序创建处理任务，
+因此同一键的更新严格按接收顺序执行。
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import Update
+
+
+class UpdateSequencer(BaseMiddleware):
+    """按用户串行、跨用户并发的更新处理层（需注册在 Dispatcher 内置的上下文中间件之后）"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+        self._depth: Dict[Hashable, int] = {}
+        self.running = 0
+        self.waiting = 0
+        self.stats = {
+            "processed": 0,
+            "queued_behind_same_key": 0,  # 到达时同一键已有更新在处理或排队
+            "max_key_depth": 0,
+            "max_waiting": 0,
+            "wait_ms_total": 0.0,
+            "max_wait_ms": 0.0,
+        }
+
+    @staticmethod
+    def key_of(data: Dict[str, Any]) -> Optional[Hashable]:
+        """排序键：发送者用户 ID；频道消息等没有发送者的更新按会话 ID"""
+        user = data.get("event_from_user")
+        if user is not None:
+            return user.id
+        chat = data.get("event_chat")
+        if chat is not None:
+            return ("chat", chat.id)
+        return None
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any],
+    ) -> Any:
+        key = self.key_of(data)
+        lock = self._enter(key) if key is not None else None
+        arrived = time.perf_counter()
+        self.waiting += 1
+        self.stats["max_waiting"] = max(self.stats["max_waiting"], self.waiting)
+        started = False
+        try:
+            # 先按键排队，轮到自己后再占用并发名额：一个用户积压的更新不会占满名额
+            if lock is not None:
+                await lock.acquire()
+            try:
+                async with self._semaphore:
+                    self.waiting -= 1
+                    started = True
+                    wait_ms = (time.perf_counter() - arrived) * 1000
+                    self.stats["wait_ms_total"] += wait_ms
+                    self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], wait_ms)
+                    self.running += 1
+                    try:
+                        return await handler(event, data)
+                    finally:
+                        self.running -= 1
+                        self.stats["processed"] += 1
+            finally:
+                if lock is not None:
+                    lock.release()
+        finally:
+            if not started:
+                self.waiting -= 1
+            if key is not None:
+                self._leave(key)
+
+    def _enter(self, key: Hashable) -> asyncio.Lock:
+        depth = self._depth.get(key, 0) + 1
+        self._depth[key] = depth
+        if depth > 1:
+            self.stats["queued_behind_same_key"] += 1
+        self.stats["max_key_depth"] = max(self.stats["max_key_depth"], depth)
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    def _leave(self, key: Hashable):
+        self._depth[key] -= 1
+        if self._depth[key] == 0:
+            del self._depth[key]
+            del self._locks[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        processed = self.stats["processed"]
+        return {
+            "limit": self.limit,
+            "running": self.running,
+            "waiting": self.waiting,
+            "active_keys": len(self._depth),
+            "processed": processed,
+            "queued_behind_same_key": self.stats["queued_behind_same_key"],
+            "max_key_depth": self.stats["max_key_depth"],
+            "max_waiting": self.stats["max_waiting"],
+            "avg_wait_ms": round(self.stats["wait_ms_total"] / processed, 2) if processed else 0.0,
+            "max_wait_ms": round(self.stats["max_wait_ms"], 2),
+        }
@@ -0,0 +1,81 @@
+"""
+启动计时模块 (startup.py)
+记录启动各阶段（模块导入、HTTP 服务器、数据库初始化、调度器、命令菜单……）的起始时刻和耗时，
+以及从进程启动到处理完第一条更新的总耗时——在按需缩容的平台上，这就是用户感知到的冷启动延迟。
+
+时刻以进程启动为零点（Linux 下包含解释器自身的启动时间）。
+报告在机器人就绪和处理完第一条更新时各写一次日志，并通过 /status 暴露。
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _process_uptime() -> float:
+    """进程已运行的秒数（从 /proc 读取；无法读取时返回 0，即以导入本模块的时刻为零点）"""
+    try:
+        with open("/proc/self/stat") as f:
+            # 进程名可能包含空格，从最后一个 ")" 之后开始按字段切分；starttime 是第 22 个字段
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            system_uptime = float(f.read().split()[0])
+        return max(0.0, system_uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+class StartupProfiler:
+    """启动阶段计时器"""
+
+    def __init__(self):
+        self.origin = time.perf_counter() - _process_uptime()
+        self.phases: List[Dict[str, Any]] = []
+        self.marks: Dict[str, float] = {}
+
+    def _ms(self, t: float) -> float:
+        return round((t - self.origin) * 1000, 1)
+
+    @contextmanager
+    def phase(self, name: str):
+        """计时一个阶段（可以在协程中使用，并发阶段按各自的起止时刻记录）"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, started)
+
+    def record(self, name: str, started: float, ended: Optional[float] = None):
+        """记录一个已知起始时刻（time.perf_counter()）的阶段"""
+        ended = ended if ended is not None else time.perf_counter()
+        self.phases.append({
+            "name": name,
+            "start_ms": self._ms(started),
+            "duration_ms": round((ended - started) * 1000, 1),
+        })
+
+    def mark(self, name: str) -> bool:
+        """记录一个时间点（同名只记录第一次），返回本次是否为第一次"""
+        if name in self.marks:
+            return False
+        self.marks[name] = self._ms(time.perf_counter())
+        return True
+
+    def report(self) -> Dict[str, Any]:
+        return {"phases": list(self.phases), "marks": dict(self.marks)}
+
+    def log_report(self, title: str):
+        lines = [f"[启动] ⏱ {title}（以进程启动为零点）"]
+        for phase in self.phases:
+            lines.append(f"    {phase['name']:<22} 开始 +{phase['start_ms']:>8.1f}ms  耗时 {phase['duration_ms']:>8.1f}ms")
+        for name, at in self.marks.items():
+            lines.append(f"    {name:<22} 时刻 +{at:>8.1f}ms")
+        logger.info("\n".join(lines))
+
+
+# 全局启动计时器（main.py 在导入其他模块之前导入）
+boot_profiler = StartupProfiler()
@@ -0,0 +1,120 @@
+"""
+长周期统计模块 (stats.py)
+基于 daily_summary（每个用户每个本地日期一行，每次记录饮水时增量累加）计算
+/stats 30|90|365|all 的达标率、当前 / 最长连续达标天数和按星期的日均饮水量。
+
+连续达标天数保存在 user_streaks 中，只在日期翻转后把新结束的日期折叠进去，
+查询时只需读取统计窗口内的汇总行，不需要回溯全部历史记录。
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# /stats 支持的长周期范围（None 表示全部历史）
+STATS_RANGES = {"30": 30, "90": 90, "365": 365, "all": None}
+
+WEEKDAY_NAMES = ("周一", "周二", "周三", "周四", "周五", "周六", "周日")
+
+
+def is_hit(total: int, goal: int) -> bool:
+    """当天是否达标（目标为 0 时不计达标）"""
+    return goal > 0 and total >= goal
+
+
+def fold_streak(current: int, longest: int, closed_through: Optional[date],
+                days: Iterable[Tuple[date, int, int]], through: date) -> Tuple[int, int]:
+    """把 closed_through 之后、through（含）之前已结束的日期折叠进连续达标状态
+
+    days 为按日期升序的 (day, total, goal)，没有汇总行的日期视为未达标；
+    closed_through 为 None 表示没有已保存的状态，从第一条汇总行开始计算。
+
+    Returns:
+        (current, longest)
+    """
+    expected = closed_through + timedelta(days=1) if closed_through else None
+    for day, total, goal in days:
+        if day > through:
+            break
+        if closed_through and day <= closed_through:
+            continue
+        if expected is not None and day != expected:
+            current = 0
+        current = current + 1 if is_hit(total, goal) else 0
+        longest = max(longest, current)
+        expected = day + timedelta(days=1)
+    if expected is not None and expected <= through:
+        current = 0
+    return current, longest
+
+
+def summarize_range(rows: Sequence[Dict[str, Any]], first_day: Optional[date],
+                    streak: Optional[Dict[str, Any]], today: date, days: Optional[int],
+                    goal: int) -> Dict[str, Any]:
+    """计算一个统计范围的汇总
+
+    Args:
+        rows: 按日期升序的 daily_summary 行，需覆盖统计窗口以及 streak 保存之后的日期
+        first_day: 用户第一条汇总行的日期（None 表示没有任何记录）
+        streak: user_streaks 行（closed_through / current_streak / longest_streak），可为 None
+        today: 用户本地的今天
+        days: 统计天数（含今天），None 表示全部历史
+        goal: 用户当前的每日目标（用于判断今天是否已达标）
+
+    今天还没有结束：只有已达标时才计入达标率；总量包含今天，日均和星期均值只统计已结束的日期。
+    """
+    state = streak or {}
+    current, longest = fold_streak(
+        state.get("current_streak", 0),
+        state.get("longest_streak", 0),
+        state.get("closed_through"),
+        ((r["day"], r["total"], r["goal"]) for r in rows),
+        today - timedelta(days=1)
+    )
+    today_total = next((r["total"] for r in reversed(rows) if r["day"] == today), 0)
+    today_hit = is_hit(today_total, goal)
+    if today_hit:
+        current += 1
+        longest = max(longest, current)
+
+    result = {
+        "start": None,
+        "today_total": today_total,
+        "total": 0,
+        "daily_avg": 0,
+        "tracked_days": 0,
+        "hit_days": 0,
+        "hit_rate": 0.0,
+        "current_streak": current,
+        "longest_streak": longest,
+        "weekday_avg": [0] * 7,
+    }
+    if first_day is None:
+        return result
+
+    start = first_day if days is None else max(first_day, today - timedelta(days=days - 1))
+    closed: List[Dict[str, Any]] = [r for r in rows if start <= r["day"] < today]
+    closed_days = (today - start).days
+    closed_total = sum(r["total"] for r in closed)
+    hit_days = sum(1 for r in closed if is_hit(r["total"], r["goal"])) + int(today_hit)
+    tracked_days = closed_days + int(today_hit)
+
+    # 窗口内每个星期几出现的次数（没有记录的日期按 0ml 计入）
+    weekday_sums = [0] * 7
+    for r in closed:
+        weekday_sums[r["day"].weekday()] += r["total"]
+    weekday_counts = [closed_days // 7] * 7
+    for offset in range(closed_days % 7):
+        weekday_counts[(start.weekday() + offset) % 7] += 1
+
+    result.update({
+        "start": start,
+        "total": closed_total + today_total,
+        "daily_avg": closed_total // closed_days if closed_days else 0,
+        "tracked_days": tracked_days,
+        "hit_days": hit_days,
+        "hit_rate": hit_days / tracked_days if tracked_days else 0.0,
+        "weekday_avg": [
+            weekday_sums[i] // weekday_counts[i] if weekday_counts[i] else 0 for i in range(7)
+        ],
+    })
+    return result
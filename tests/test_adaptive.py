@@ -0,0 +1,129 @@
+from datetime import datetime
+
+import pytest
+
+from adaptive import (
+    HABIT_FACTOR,
+    MAX_FACTOR,
+    MIN_PATTERN_WEIGHT,
+    MIN_RESPONSE_SAMPLES,
+    _mass,
+    _window,
+    habit_ratio,
+    next_interval,
+    pace_gap,
+    response_rate,
+)
+
+
+def user(**overrides):
+    base = {"interval_min": 60, "start_time": "08:00", "end_time": "22:00", "daily_goal": 2000,
+            "drink_hours": None, "reminders_sent": 0, "reminders_answered": 0}
+    base.update(overrides)
+    return base
+
+
+def at(hour, minute=0):
+    return datetime(2026, 7, 1, hour, minute)
+
+
+def test_mass_splits_span_at_hour_boundaries():
+    weights = [float(h) for h in range(24)]
+    assert _mass(weights, 50, 20) == 10 * 0 + 10 * 1
+    assert _mass(weights, 60, 60) == 60 * 1
+    assert _mass(weights, 30, 150) == 30 * 0 + 60 * 1 + 60 * 2
+    # 跨越午夜回到 0 点
+    assert _mass(weights, 23 * 60 + 50, 20) == 10 * 23 + 10 * 0
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    ("08:00", "22:00", (480, 840)),
+    ("22:00", "02:00", (1320, 240)),
+    ("08:00", "08:00", (480, 1440)),
+    (None, None, (0, 1440)),
+])
+def test_window(start, end, expected):
+    assert _window({"start_time": start, "end_time": end}) == expected
+
+
+def test_pace_gap_in_wrapping_window():
+    night = user(start_time="22:00", end_time="02:00")
+    assert pace_gap(night, 0, 0) == pytest.approx(0.5)
+    assert pace_gap(night, 1000, 23 * 60) == pytest.approx(60 / 240 - 0.5)
+    assert pace_gap(night, 0, 3 * 60) is None  # 活跃时段外
+    assert pace_gap(user(daily_goal=0), 0, 12 * 60) is None
+    # 超额完成按 100% 计
+    assert pace_gap(user(), 5000, 15 * 60) == pytest.approx(0.5 - 1.0)
+
+
+def test_habit_ratio_needs_enough_history():
+    hours = [0.0] * 24
+    hours[12] = MIN_PATTERN_WEIGHT - 1
+    assert habit_ratio(hours, user(), 11 * 60 + 30, 60) is None
+    assert habit_ratio(None, user(), 12 * 60, 60) is None
+    assert habit_ratio([1.0] * 23, user(), 12 * 60, 60) is None
+    hours[12] = MIN_PATTERN_WEIGHT
+    # 直方图按“每分钟取所在小时的权重”累加：活跃时段平均 8 * 60 / 840，接下来一小时中有半小时落在 12 点
+    assert habit_ratio(hours, user(), 11 * 60 + 30, 60) == pytest.approx((30 * 8 / 60) / (8 * 60 / 840))
+
+
+def test_habit_ratio_in_wrapping_window():
+    hours = [0.0] * 24
+    hours[23] = hours[0] = 6.0
+    night = user(start_time="22:00", end_time="02:00")
+    # 活跃时段 22~02 的平均水平为 12 * 60 / 240；23:30 起一小时正好落在 23 点和 0 点
+    assert habit_ratio(hours, night, 23 * 60 + 30, 60) == pytest.approx(6.0 / (12 * 60 / 240))
+
+
+def test_response_rate_needs_samples():
+    assert response_rate(user(reminders_sent=MIN_RESPONSE_SAMPLES - 1, reminders_answered=0)) is None
+    assert response_rate(user(reminders_sent=20, reminders_answered=5)) == 0.25
+
+
+def test_on_pace_returns_base_interval():
+    # 08:00 ~ 22:00 过去一半，完成一半
+    assert next_interval(user(), 1000, at(15)) == (60, "base")
+
+
+def test_goal_reached_uses_max_factor():
+    assert next_interval(user(), 2000, at(12)) == (int(60 * MAX_FACTOR), "goal_reached")
+
+
+def test_behind_is_clamped_to_min_factor():
+    # 时段快结束还一口没喝：系数 1 - min(0.5, gap) = 0.5
+    assert next_interval(user(), 0, at(21, 50)) == (30, "behind")
+    assert next_interval(user(), 0, at(12)) == (round(60 * (1 - 4 / 14)), "behind")
+
+
+def test_combined_factors_are_clamped_to_max():
+    hours = [0.0] * 24
+    hours[9] = 20.0
+    ignored = user(drink_hours=hours, reminders_sent=50, reminders_answered=1)
+    minutes, reason = next_interval(ignored, 1900, at(9))
+    assert reason == "ahead+habit+ignored"
+    assert minutes == int(60 * MAX_FACTOR)
+
+
+def test_habit_alone_lengthens_interval():
+    hours = [0.0] * 24
+    hours[15] = 20.0
+    assert next_interval(user(drink_hours=hours), 1000, at(15)) == (round(60 * HABIT_FACTOR), "habit")
+
+
+@pytest.mark.parametrize("interval, expected", [
+    (20, 15),  # 缩短后不低于 MIN_INTERVAL
+    (10, 10),  # 设置本身短于 MIN_INTERVAL 时不再缩短
+])
+def test_min_interval_floor(interval, expected):
+    assert next_interval(user(interval_min=interval), 0, at(21, 50))[0] == expected
+
+
+def test_outside_window_keeps_base():
+    assert next_interval(user(), 0, at(23)) == (60, "base")
+
+
+def test_wrapping_window_pace():
+    night = user(start_time="22:00", end_time="06:00")
+    # 02:00 过去一半、未喝水：落后 0.5
+    assert next_interval(night, 0, at(2)) == (30, "behind")
+    assert next_interval(night, 1000, at(2)) == (60, "base")
@@ -0,0 +1,110 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from eligibility import QUIET_SLOTS, ReminderTable  # noqa: E402
+from timezones import is_in_active_period, to_local, user_tz  # noqa: E402
+
+ZONES = [0, 8, -5, 5, "Europe/Berlin", "Asia/Kolkata", "America/New_York", "Australia/Adelaide"]
+
+
+def hhmm(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def minutes_of(value):
+    hour, minute = map(int, value.split(":"))
+    return hour * 60 + minute
+
+
+def random_user(user_id, rng, now):
+    quiet = []
+    for _ in range(rng.randint(0, 3)):
+        start = rng.randrange(24 * 60)
+        quiet.append({"start": hhmm(start), "end": hhmm(rng.randrange(start, 24 * 60))})
+    zone = rng.choice(ZONES)
+    return {
+        "user_id": user_id,
+        "start_time": hhmm(rng.randrange(0, 24 * 60, 15)),
+        "end_time": hhmm(rng.randrange(0, 24 * 60, 15)),
+        "tz_name": zone if isinstance(zone, str) else None,
+        "timezone": zone if isinstance(zone, int) else 8,
+        "interval_min": rng.choice([30, 60, 90]),
+        "quiet_hours": quiet,
+        "is_disabled": rng.random() < 0.1,
+        "last_remind_time": now - timedelta(minutes=rng.randrange(0, 180)),
+    }
+
+
+def scalar_eligible(user, blacklisted, now):
+    """逐个用户的标量判断：未禁用、已到期、在活跃时段内、不在免打扰时段内"""
+    local = to_local(now, user_tz(user))
+    minute = local.hour * 60 + local.minute
+    quiet = any(
+        minutes_of(q["start"]) <= minute <= minutes_of(q["end"])
+        for q in user["quiet_hours"][:QUIET_SLOTS]
+    )
+    due = user["last_remind_time"] + timedelta(minutes=user["interval_min"]) <= now
+    return (not user["is_disabled"] and not blacklisted and due
+            and is_in_active_period(local, user["start_time"], user["end_time"]) and not quiet)
+
+
+def test_vectorized_mask_matches_scalar_checks():
+    rng = random.Random(7)
+    base = datetime(2026, 3, 28, 0, 0)
+    users = [random_user(i, rng, base) for i in range(400)]
+    blacklisted = {u["user_id"]: rng.random() < 0.05 for u in users}
+    table = ReminderTable(capacity=16)  # 同时覆盖扩容
+    for user in users:
+        table.upsert(user, blacklisted=blacklisted[user["user_id"]])
+
+    # 覆盖一整天的各个时刻和夏令时切换日
+    for step in range(0, 2 * 24 * 60, 37):
+        now = base + timedelta(minutes=step)
+        mask = table.eligible_mask(now)
+        expected = [scalar_eligible(u, blacklisted[u["user_id"]], now) for u in users]
+        assert mask.tolist() == expected, now
+
+
+@pytest.mark.parametrize("start, end, minute, expected", [
+    ("08:00", "22:00", 8 * 60, True),
+    ("08:00", "22:00", 22 * 60, False),
+    ("22:00", "08:00", 23 * 60, True),
+    ("22:00", "08:00", 7 * 60 + 59, True),
+    ("22:00", "08:00", 12 * 60, False),
+    ("08:00", "08:00", 3 * 60, True),  # start == end 视为全天
+])
+def test_window_edges_match_scalar(start, end, minute, expected):
+    now = datetime(2026, 7, 1) + timedelta(minutes=minute)
+    user = {"user_id": 1, "start_time": start, "end_time": end, "timezone": 0, "interval_min": 60}
+    table = ReminderTable()
+    table.upsert(user)
+    assert bool(table.eligible_mask(now)[0]) is expected
+    assert is_in_active_period(now, start, end) is expected
+
+
+def test_remove_keeps_rows_compact():
+    now = datetime(2026, 7, 1, 12, 0)
+    table = ReminderTable()
+    for user_id in (1, 2, 3):
+        table.upsert({"user_id": user_id, "start_time": "00:00", "end_time": "23:59", "timezone": 0})
+    table.remove(1)
+    assert len(table) == 2 and 1 not in table
+    assert sorted(table.due(now).tolist()) == [2, 3]
+    table.remove(42)
+    assert len(table) == 2
+
+
+def test_mark_sent_and_reschedule():
+    now = datetime(2026, 7, 1, 12, 0)
+    table = ReminderTable()
+    table.upsert({"user_id": 1, "start_time": "00:00", "end_time": "23:59", "timezone": 0, "interval_min": 30})
+    assert table.due(now).tolist() == [1]
+    table.mark_sent([1], now)
+    assert table.due(now + timedelta(minutes=29)).tolist() == []
+    assert table.due(now + timedelta(minutes=30)).tolist() == [1]
+    table.reschedule(1, now + timedelta(hours=2))
+    assert table.due(now + timedelta(minutes=119)).tolist() == []
@@ -0,0 +1,188 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+from leaderboard import PERIOD_DAY, PERIOD_WEEK, GroupLeaderboards, RankedTotals, period_bounds
+
+CHAT = -100
+WEDNESDAY = date(2026, 6, 3)
+
+
+# ==================== RankedTotals ====================
+
+def test_tied_totals_share_rank():
+    board = RankedTotals({1: 500, 2: 500, 3: 300, 4: 700})
+    assert [board.rank(u) for u in (4, 1, 2, 3)] == [1, 2, 2, 4]
+    assert board.top(3) == [(4, 700), (1, 500), (2, 500)]
+    assert board.rank(99) is None
+
+
+def test_set_existing_member_moves_it():
+    board = RankedTotals({1: 500, 2: 400, 3: 300})
+    board.set(3, 800)
+    assert len(board) == 3
+    assert board.members() == [(3, 800), (1, 500), (2, 400)]
+    board.set(3, 400)  # 与 2 并列
+    assert board.members() == [(1, 500), (2, 400), (3, 400)]
+    assert board.rank(2) == board.rank(3) == 2
+    board.set(1, 500)  # 值不变
+    assert board.members() == [(1, 500), (2, 400), (3, 400)]
+    assert len(board._keys) == len(board.totals)
+
+
+def test_add_and_remove():
+    board = RankedTotals({1: 500})
+    board.add(2, 600)
+    board.add(1, 200)
+    assert board.members() == [(1, 700), (2, 600)]
+    board.add(1, -300)  # 撤销记录
+    assert board.members() == [(2, 600), (1, 400)]
+    board.remove(2)
+    board.remove(42)
+    assert board.members() == [(1, 400)]
+    assert board.rank(1) == 1 and 2 not in board
+
+
+# ==================== GroupLeaderboards ====================
+
+class FakeLoader:
+    """按调用次数返回不同结果的 loader，可在加载过程中执行回调（模拟并发的饮水记录）"""
+
+    def __init__(self, *results, during=None):
+        self.results = list(results)
+        self.during = during or {}
+        self.calls = []
+
+    async def __call__(self, chat_id, start, end):
+        call = len(self.calls)
+        self.calls.append((chat_id, start, end))
+        await asyncio.sleep(0)
+        if call in self.during:
+            self.during[call]()
+        result = self.results[min(call, len(self.results) - 1)]
+        if isinstance(result, Exception):
+            raise result
+        return [{"user_id": u, "total": t, "display_name": f"u{u}"} for u, t in result.items()]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_period_bounds():
+    assert period_bounds(PERIOD_DAY, WEDNESDAY) == (WEDNESDAY, WEDNESDAY)
+    assert period_bounds(PERIOD_WEEK, WEDNESDAY) == (date(2026, 6, 1), date(2026, 6, 7))
+
+
+def test_board_is_loaded_once_and_updated_incrementally():
+    loader = FakeLoader({1: 500, 2: 300})
+    boards = GroupLeaderboards(loader)
+
+    async def scenario():
+        board = await boards.board(CHAT, PERIOD_DAY, WEDNESDAY)
+        boards.record(2, WEDNESDAY, 400)
+        boards.record(1, WEDNESDAY - timedelta(days=1), 1000)  # 不在周期内
+        boards.record(3, WEDNESDAY, 1000)  # 不是成员
+        again = await boards.board(CHAT, PERIOD_DAY, WEDNESDAY)
+        return board, again
+
+    board, again = run(scenario())
+    assert again is board
+    assert len(loader.calls) == 1
+    assert board.members() == [(2, 700), (1, 500)]
+    assert boards.names[1] == "u1"
+    assert boards.stats["hits"] == 1
+
+
+def test_record_during_load_triggers_refetch():
+    boards = GroupLeaderboards(None)
+    # 第一次查询期间成员 2 记录了饮水：无法确定结果是否已包含该记录，重新查询一次
+    boards.loader = FakeLoader({1: 500, 2: 300}, {1: 500, 2: 550},
+                               during={0: lambda: boards.record(2, WEDNESDAY, 250)})
+    board = run(boards.board(CHAT, PERIOD_DAY, WEDNESDAY))
+    assert len(boards.loader.calls) == 2
+    assert board.members() == [(2, 550), (1, 500)]
+    assert boards._touched == {}
+
+
+def test_refetch_is_bounded():
+    boards = GroupLeaderboards(None)
+    touch = lambda: boards.record(1, WEDNESDAY, 100)  # noqa: E731
+    boards.loader = FakeLoader({1: 100}, {1: 200}, {1: 300}, during={0: touch, 1: touch})
+    board = run(boards.board(CHAT, PERIOD_DAY, WEDNESDAY))
+    assert len(boards.loader.calls) == 2
+    assert board.totals == {1: 200}
+
+
+def test_join_during_load_triggers_refetch():
+    boards = GroupLeaderboards(None)
+    boards.loader = FakeLoader({1: 100}, {1: 100, 2: 0}, during={0: lambda: boards.join(CHAT, 2, "new")})
+    board = run(boards.board(CHAT, PERIOD_DAY, WEDNESDAY))
+    assert len(boards.loader.calls) == 2
+    assert 2 in board
+
+
+def test_concurrent_viewers_share_one_load():
+    loader = FakeLoader({1: 100})
+    boards = GroupLeaderboards(loader)
+
+    async def scenario():
+        return await asyncio.gather(*(boards.board(CHAT, PERIOD_DAY, WEDNESDAY) for _ in range(5)))
+
+    results = run(scenario())
+    assert len(loader.calls) == 1
+    assert all(b is results[0] for b in results)
+
+
+def test_failed_load_is_retried_next_time():
+    loader = FakeLoader(RuntimeError("db down"), {1: 100})
+    boards = GroupLeaderboards(loader)
+    with pytest.raises(RuntimeError):
+        run(boards.board(CHAT, PERIOD_DAY, WEDNESDAY))
+    assert run(boards.board(CHAT, PERIOD_DAY, WEDNESDAY)).totals == {1: 100}
+    assert boards._loading == {}
+
+
+def test_period_rollover_reloads_with_new_bounds():
+    loader = FakeLoader({1: 100}, {1: 0}, {1: 700}, {1: 50})
+    boards = GroupLeaderboards(loader)
+
+    async def scenario():
+        await boards.board(CHAT, PERIOD_DAY, WEDNESDAY)
+        day_after = await boards.board(CHAT, PERIOD_DAY, WEDNESDAY + timedelta(days=1))
+        await boards.board(CHAT, PERIOD_WEEK, WEDNESDAY)
+        await boards.board(CHAT, PERIOD_WEEK, WEDNESDAY + timedelta(days=3))  # 同一周（周六）
+        next_week = await boards.board(CHAT, PERIOD_WEEK, WEDNESDAY + timedelta(days=5))
+        return day_after, next_week
+
+    day_after, next_week = run(scenario())
+    assert [c[1:] for c in loader.calls] == [
+        (WEDNESDAY, WEDNESDAY),
+        (WEDNESDAY + timedelta(days=1), WEDNESDAY + timedelta(days=1)),
+        (date(2026, 6, 1), date(2026, 6, 7)),
+        (date(2026, 6, 8), date(2026, 6, 14)),
+    ]
+    assert day_after.totals == {1: 0}
+    # 翻转后旧榜单不再接收更新
+    boards.record(1, WEDNESDAY, 999)
+    assert day_after.totals == {1: 0}
+    assert next_week.totals == {1: 50}
+
+
+def test_join_leave_and_forget():
+    loader = FakeLoader({1: 100}, {1: 100, 2: 0})
+    boards = GroupLeaderboards(loader)
+    run(boards.board(CHAT, PERIOD_DAY, WEDNESDAY))
+    boards.join(CHAT, 1, "again")  # 已是成员，不失效
+    run(boards.board(CHAT, PERIOD_DAY, WEDNESDAY))
+    assert len(loader.calls) == 1
+    boards.join(CHAT, 2, "new")
+    board = run(boards.board(CHAT, PERIOD_DAY, WEDNESDAY))
+    assert len(loader.calls) == 2 and 2 in board
+    boards.leave(CHAT, 2)
+    assert 2 not in board
+    boards.record(2, WEDNESDAY, 500)
+    assert 2 not in board
+    boards.forget_group(CHAT)
+    assert boards.summary()["boards"] == 0
@@ -0,0 +1,69 @@
+"""REMINDER_ELIGIBLE_SQL 的数据库测试：需要一个可写的 PostgreSQL 测试库（TEST_DATABASE_URL），未设置时跳过"""
+
+import asyncio
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+DSN = os.getenv("TEST_DATABASE_URL")
+if not DSN:
+    pytest.skip("未设置 TEST_DATABASE_URL", allow_module_level=True)
+pytest.importorskip("asyncpg")
+
+# database 在导入时读取 DATABASE_URL，并从 config 读取连接池配置（config 要求设置 TELEGRAM_TOKEN）
+os.environ["DATABASE_URL"] = DSN
+os.environ.setdefault("TELEGRAM_TOKEN", "test")
+
+from database import DatabaseManager  # noqa: E402
+from timezones import zone_key  # noqa: E402
+
+USER_BASE = 970_000_000
+
+
+def noon_offset():
+    """让用户本地时间落在 12 点前后的整数时区，活跃 / 免打扰时段的判断结果与测试运行时刻无关"""
+    offset = 12 - datetime.utcnow().hour
+    return offset if offset >= -11 else offset + 24
+
+
+# (start_time, end_time, quiet_hours, 是否应当提醒)
+ROWS = [
+    ("06:00", "20:00", [], True),
+    ("25:00", "20:00", [], True),  # 格式错误的活跃时段视为全天活跃
+    ("06:00", "abc", [], True),
+    ("14:00", "20:00", [], False),
+    ("06:00", "20:00", [{"start": "24:00", "end": "13:00"}], True),  # 格式错误的免打扰时段忽略
+    ("06:00", "20:00", [{"start": "11:00", "end": "13:00"}], False),
+    ("06:00", "20:00", [{"start": "99:99", "end": "x"}, {"start": "11:00", "end": "13:00"}], False),
+]
+
+
+async def eligible_user_ids():
+    db = DatabaseManager()
+    await db.init()
+    user_ids = [USER_BASE + i for i in range(len(ROWS))]
+    try:
+        async with db.pool.acquire() as conn:
+            await conn.execute("DELETE FROM users WHERE user_id = ANY($1::bigint[])", user_ids)
+        for user_id, (start, end, quiet, _) in zip(user_ids, ROWS):
+            await db.get_or_create_user(user_id)
+            async with db.pool.acquire() as conn:
+                await conn.execute(
+                    """UPDATE users SET start_time = $2, end_time = $3, quiet_hours = $4::jsonb,
+                           timezone = $5, tz_name = NULL
+                       WHERE user_id = $1""",
+                    user_id, start, end, json.dumps(quiet), noon_offset()
+                )
+        contexts = await db.get_reminder_contexts(user_ids, [zone_key(noon_offset())] * len(user_ids))
+        return {c["user_id"] - USER_BASE for c in contexts}
+    finally:
+        async with db.pool.acquire() as conn:
+            await conn.execute("DELETE FROM users WHERE user_id = ANY($1::bigint[])", user_ids)
+        await db.close()
+
+
+def test_malformed_rows_do_not_abort_the_batch():
+    expected = {i for i, row in enumerate(ROWS) if row[3]}
+    assert asyncio.run(eligible_user_ids()) == expected
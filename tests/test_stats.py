@@ -0,0 +1,126 @@
+from datetime import date, timedelta
+
+import pytest
+
+from stats import fold_streak, is_hit, summarize_range
+
+GOAL = 2000
+MONDAY = date(2026, 6, 1)
+
+
+def d(n):
+    return MONDAY + timedelta(days=n)
+
+
+def row(n, total, goal=GOAL):
+    return {"day": d(n), "total": total, "goal": goal}
+
+
+@pytest.mark.parametrize("total, goal, expected", [
+    (2000, 2000, True),
+    (1999, 2000, False),
+    (5000, 0, False),  # 目标为 0 不计达标
+])
+def test_is_hit(total, goal, expected):
+    assert is_hit(total, goal) is expected
+
+
+@pytest.mark.parametrize("state, days, through, expected", [
+    # 没有保存的状态：从第一条汇总行开始
+    ((0, 0, None), [(0, 2000), (1, 2500), (2, 2000)], 2, (3, 3)),
+    ((0, 0, None), [], 2, (0, 0)),
+    # 汇总行之间有空缺：空缺的日期视为未达标
+    ((0, 0, None), [(0, 2000), (1, 2000), (3, 2000)], 3, (1, 2)),
+    # through 之前最后几天没有汇总行
+    ((0, 0, None), [(0, 2000), (1, 2000)], 3, (0, 2)),
+    # 未达标中断连续
+    ((0, 0, None), [(0, 2000), (1, 1000), (2, 2000)], 2, (1, 1)),
+    # through 之后的行（今天）不折叠
+    ((0, 0, None), [(0, 2000), (1, 2000)], 0, (1, 1)),
+    # 已保存的状态：closed_through 及之前的行跳过
+    ((2, 5, 1), [(0, 0), (1, 0), (2, 2000)], 2, (3, 5)),
+    ((2, 5, 1), [(3, 2000)], 3, (1, 5)),
+    ((2, 5, 1), [], 1, (2, 5)),
+    ((2, 5, 1), [], 2, (0, 5)),
+    ((4, 4, 1), [(2, 2000), (3, 2000)], 3, (6, 6)),
+])
+def test_fold_streak(state, days, through, expected):
+    current, longest, closed = state
+    rows = [(d(n), total, GOAL) for n, total in days]
+    assert fold_streak(current, longest, d(closed) if closed is not None else None, rows, d(through)) == expected
+
+
+def test_fold_streak_uses_each_days_own_goal():
+    rows = [(d(0), 1500, 1500), (d(1), 1500, 2000)]
+    assert fold_streak(0, 0, None, rows, d(1)) == (0, 1)
+
+
+def summarize(rows, today, days=None, streak=None, first_day=0, goal=GOAL):
+    return summarize_range(rows, d(first_day) if first_day is not None else None, streak, d(today), days, goal)
+
+
+def test_no_records():
+    result = summarize([], today=3, first_day=None)
+    assert result["start"] is None
+    assert (result["tracked_days"], result["hit_days"], result["hit_rate"]) == (0, 0, 0.0)
+    assert (result["current_streak"], result["longest_streak"]) == (0, 0)
+
+
+@pytest.mark.parametrize("today_total, hit_days, tracked_days, current, longest", [
+    # 今天已达标：计入达标率和连续天数
+    (2500, 3, 4, 2, 2),
+    # 今天未达标：今天还没结束，不计入分母，也不中断连续
+    (500, 2, 3, 1, 1),
+])
+def test_today_hit_counting(today_total, hit_days, tracked_days, current, longest):
+    rows = [row(0, 2000), row(1, 1000), row(2, 2200), row(3, today_total)]
+    result = summarize(rows, today=3)
+    assert result["today_total"] == today_total
+    assert result["total"] == 5200 + today_total
+    assert result["daily_avg"] == 5200 // 3
+    assert (result["hit_days"], result["tracked_days"]) == (hit_days, tracked_days)
+    assert result["hit_rate"] == pytest.approx(hit_days / tracked_days)
+    assert (result["current_streak"], result["longest_streak"]) == (current, longest)
+
+
+def test_gaps_count_as_zero_days():
+    rows = [row(0, 2000), row(4, 2000)]
+    result = summarize(rows, today=5)
+    assert result["tracked_days"] == 5
+    assert result["hit_days"] == 2
+    assert result["daily_avg"] == 4000 // 5
+    assert (result["current_streak"], result["longest_streak"]) == (1, 1)
+
+
+def test_window_starts_at_first_day_or_range():
+    rows = [row(n, 2000) for n in range(10)]
+    assert summarize(rows, today=9, days=3)["start"] == d(7)
+    # d7、d8 已结束，今天 d9 已达标也计入
+    assert summarize(rows, today=9, days=3)["tracked_days"] == 3
+    assert summarize(rows, today=9, days=30)["start"] == d(0)
+    assert summarize(rows, today=9, days=None)["start"] == d(0)
+
+
+def test_saved_streak_is_extended():
+    streak = {"closed_through": d(1), "current_streak": 10, "longest_streak": 12}
+    rows = [row(2, 2000), row(3, 2000)]
+    result = summarize(rows, today=3, days=2, streak=streak)
+    assert (result["current_streak"], result["longest_streak"]) == (12, 12)
+
+
+def test_weekday_denominators_include_days_without_records():
+    # 周一 d0 到周三 d9（不含今天）共 9 天：周一、周二各出现 2 次，其余各 1 次
+    rows = [row(0, 1000), row(2, 700), row(7, 3000)]
+    result = summarize(rows, today=9)
+    averages = result["weekday_avg"]
+    assert averages[0] == 4000 // 2
+    assert averages[1] == 0
+    assert averages[2] == 700
+    assert averages[3:] == [0, 0, 0, 0]
+
+
+def test_weekday_average_ignores_today():
+    rows = [row(0, 1400), row(7, 9999)]
+    result = summarize(rows, today=7)
+    assert result["weekday_avg"][0] == 1400
+    assert result["total"] == 1400 + 9999
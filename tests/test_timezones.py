@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from timezones import (
+    _table,
+    day_bounds_utc,
+    local_time_to_utc,
+    parse_timezone,
+    to_local,
+    to_utc,
+    tz_label,
+    utc_offset,
+    utc_offsets_bulk,
+    zone_key,
+)
+
+BERLIN = "Europe/Berlin"
+
+
+def last_sunday_1am_utc(year, month):
+    """欧洲夏令时在 3 月 / 10 月最后一个星期日的 01:00 UTC 切换"""
+    day = datetime(year, month + 1, 1) - timedelta(days=1)
+    return (day - timedelta(days=(day.weekday() - 6) % 7)).replace(hour=1)
+
+
+# 切换表覆盖当前年份前后几年，用今年的切换时刻测试：
+# 春季本地 02:00 → 03:00（+1 → +2），秋季本地 03:00 → 02:00（+2 → +1）
+YEAR = datetime.utcnow().year
+SPRING_UTC = last_sunday_1am_utc(YEAR, 3)
+AUTUMN_UTC = last_sunday_1am_utc(YEAR, 10)
+SPRING_DAY = SPRING_UTC.date()
+AUTUMN_DAY = AUTUMN_UTC.date()
+
+
+def local(day, hour, minute=0):
+    return datetime(day.year, day.month, day.day, hour, minute)
+
+
+@pytest.mark.parametrize("spec, key, hours", [
+    (0, "Etc/UTC", 0),
+    (None, "Etc/UTC", 0),
+    (8, "Etc/GMT-8", 8),
+    (-5, "Etc/GMT+5", -5),
+    (14, "Etc/GMT-14", 14),
+])
+def test_integer_offsets_map_to_etc_zones_with_inverted_sign(spec, key, hours):
+    assert zone_key(spec) == key
+    assert utc_offset(spec, datetime(2026, 7, 1)) == timedelta(hours=hours)
+
+
+def test_iana_names_pass_through():
+    assert zone_key(BERLIN) == BERLIN
+
+
+def test_transition_table_finds_dst_switches_to_the_minute():
+    table = _table(BERLIN)
+    instants = {datetime.fromtimestamp(ts, tz=dt_timezone.utc).replace(tzinfo=None) for ts in table.instants}
+    assert SPRING_UTC in instants
+    assert AUTUMN_UTC in instants
+
+
+@pytest.mark.parametrize("utc_dt, hours", [
+    (SPRING_UTC - timedelta(minutes=1), 1),
+    (SPRING_UTC, 2),
+    (AUTUMN_UTC - timedelta(minutes=1), 2),
+    (AUTUMN_UTC, 1),
+])
+def test_offset_flips_exactly_at_transition(utc_dt, hours):
+    assert utc_offset(BERLIN, utc_dt) == timedelta(hours=hours)
+
+
+def test_transition_table_agrees_with_zoneinfo():
+    zone = ZoneInfo(BERLIN)
+    ts = datetime(YEAR, 1, 1)
+    while ts < datetime(YEAR + 1, 1, 1):
+        expected = ts.replace(tzinfo=dt_timezone.utc).astimezone(zone).utcoffset()
+        assert utc_offset(BERLIN, ts) == expected, ts
+        ts += timedelta(hours=5, minutes=17)
+
+
+def test_outside_table_range_falls_back_to_zoneinfo():
+    assert utc_offset(BERLIN, datetime(2040, 7, 1)) == timedelta(hours=2)
+    assert utc_offset(BERLIN, datetime(2000, 1, 1)) == timedelta(hours=1)
+
+
+def test_bulk_offsets_match_single_lookups():
+    now = datetime(2026, 7, 1, 12, 0)
+    specs = [8, BERLIN, -5, BERLIN, 0]
+    assert utc_offsets_bulk(specs, now) == [int(utc_offset(s, now).total_seconds()) for s in specs]
+
+
+def test_to_local_round_trip_across_dst():
+    for utc_dt in (SPRING_UTC - timedelta(minutes=30), SPRING_UTC, AUTUMN_UTC - timedelta(hours=2)):
+        assert to_utc(to_local(utc_dt, BERLIN), BERLIN) == utc_dt
+
+
+def test_gap_minute_uses_offset_before_transition():
+    # 切换当天本地 02:30 不存在，按切换前的偏移（+1）换算
+    assert to_utc(local(SPRING_DAY, 2, 30), BERLIN) == local(SPRING_DAY, 1, 30)
+    assert to_utc(local(SPRING_DAY, 3), BERLIN) == SPRING_UTC
+
+
+def test_fold_minute_resolves_to_first_occurrence():
+    # 切换当天本地 02:30 出现两次，取第一次（夏令时，+2）
+    assert to_utc(local(AUTUMN_DAY, 2, 30), BERLIN) == local(AUTUMN_DAY, 0, 30)
+    # 两次出现都换算回同一个本地时间
+    assert to_local(local(AUTUMN_DAY, 0, 30), BERLIN) == local(AUTUMN_DAY, 2, 30)
+    assert to_local(local(AUTUMN_DAY, 1, 30), BERLIN) == local(AUTUMN_DAY, 2, 30)
+
+
+@pytest.mark.parametrize("now, hours", [
+    (local(SPRING_DAY, 12), 23),
+    (local(AUTUMN_DAY, 12), 25),
+    (datetime(YEAR, 7, 1, 12, 0), 24),
+])
+def test_day_bounds_cover_dst_days(now, hours):
+    start, end = day_bounds_utc(BERLIN, now=now)
+    assert end - start == timedelta(hours=hours)
+    assert to_local(start, BERLIN) == datetime.combine(now.date(), datetime.min.time())
+
+
+def test_day_bounds_for_integer_offset_and_days_ago():
+    start, end = day_bounds_utc(8, now=datetime(2026, 7, 1, 20, 0))  # 本地已是 7 月 2 日 04:00
+    assert (start, end) == (datetime(2026, 7, 1, 16, 0), datetime(2026, 7, 2, 16, 0))
+    start, _ = day_bounds_utc(8, days_ago=1, now=datetime(2026, 7, 1, 20, 0))
+    assert start == datetime(2026, 6, 30, 16, 0)
+
+
+def test_local_time_to_utc_on_dst_day():
+    assert local_time_to_utc(BERLIN, "08:00", SPRING_DAY) == local(SPRING_DAY, 6)
+    eve = SPRING_DAY - timedelta(days=1)
+    assert local_time_to_utc(BERLIN, "08:00", eve) == local(eve, 7)
+
+
+def test_parse_timezone():
+    assert parse_timezone(" 8 ") == 8
+    assert parse_timezone(BERLIN) == BERLIN
+    with pytest.raises(ValueError):
+        parse_timezone("15")
+    with pytest.raises(ValueError):
+        parse_timezone("Mars/Olympus")
+
+
+def test_tz_label():
+    assert tz_label(8) == "UTC+8"
+    assert tz_label("Asia/Kolkata", datetime(2026, 1, 1)) == "UTC+5:30 (Asia/Kolkata)"
+    assert tz_label(BERLIN, datetime(2026, 7, 1)) == "UTC+2 (Europe/Berlin)"
@@ -0,0 +1,101 @@
+import pickle
+from datetime import datetime, timezone as dt_timezone
+
+import pytest
+
+pytest.importorskip("apscheduler")
+
+from triggers import ActiveWindowTrigger, _allowed_minutes, _wait_table  # noqa: E402
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+def minute(hhmm):
+    hour, mins = map(int, hhmm.split(":"))
+    return hour * 60 + mins
+
+
+def test_wait_table_for_window_wrapping_midnight():
+    wait = _wait_table(_allowed_minutes("22:00", "02:00", []))
+    assert wait[minute("21:00")] == 60
+    assert wait[minute("23:30")] == 0
+    assert wait[minute("01:59")] == 0
+    # 02:00 起不再允许，等到当天 22:00
+    assert wait[minute("02:00")] == 20 * 60
+
+
+def test_quiet_hours_inside_window_are_skipped_inclusive():
+    wait = _wait_table(_allowed_minutes("08:00", "22:00", [(minute("12:00"), minute("13:00"))]))
+    assert wait[minute("11:59")] == 0
+    assert wait[minute("12:00")] == 61
+    assert wait[minute("13:00")] == 1
+    assert wait[minute("13:01")] == 0
+
+
+def test_fully_quiet_day_never_fires():
+    trigger = ActiveWindowTrigger(60, "08:00", "22:00", 0, [{"start": "00:00", "end": "23:59"}])
+    assert trigger.next_allowed(utc(2026, 7, 1, 9, 0)) is None
+    assert trigger.get_next_fire_time(None, utc(2026, 7, 1, 9, 0)) is None
+
+
+def test_next_allowed_jumps_to_window_start_in_user_zone():
+    trigger = ActiveWindowTrigger(60, "08:00", "22:00", 8)
+    # 23:00 UTC = 本地 07:00，跳到本地 08:00 = 00:00 UTC
+    assert trigger.next_allowed(utc(2026, 7, 1, 23, 0)) == utc(2026, 7, 2, 0, 0)
+    assert trigger.next_allowed(utc(2026, 7, 2, 3, 17)) == utc(2026, 7, 2, 3, 17)
+
+
+def test_next_fire_skips_night_and_quiet_hours():
+    trigger = ActiveWindowTrigger(90, "22:00", "06:00", 0, [{"start": "01:00", "end": "02:00"}],
+                                  start_date=datetime(2026, 7, 1, 21, 0))
+    first = trigger.get_next_fire_time(None, utc(2026, 7, 1, 20, 0))
+    assert first == utc(2026, 7, 1, 22, 0)
+    # 22:00 + 90 = 23:30 → 01:00 落在免打扰时段内，推到 02:01
+    second = trigger.get_next_fire_time(first, first)
+    third = trigger.get_next_fire_time(second, second)
+    assert (second, third) == (utc(2026, 7, 1, 23, 30), utc(2026, 7, 2, 2, 1))
+    # 02:01 + 90 = 03:31 → 05:01 → 06:31 已出活跃时段，跳到当晚 22:00
+    fourth = trigger.get_next_fire_time(third, third)
+    fifth = trigger.get_next_fire_time(fourth, fourth)
+    assert fourth == utc(2026, 7, 2, 3, 31)
+    assert trigger.get_next_fire_time(fifth, fifth) == utc(2026, 7, 2, 22, 0)
+
+
+def test_dst_day_uses_local_offset():
+    trigger = ActiveWindowTrigger(60, "08:00", "22:00", "Europe/Berlin")
+    # 2026-03-29 夏令时开始：本地 08:00 = 06:00 UTC（前一天为 07:00 UTC）
+    assert trigger.next_allowed(utc(2026, 3, 29, 2, 0)) == utc(2026, 3, 29, 6, 0)
+    assert trigger.next_allowed(utc(2026, 3, 28, 2, 0)) == utc(2026, 3, 28, 7, 0)
+
+
+def test_naive_start_date_is_utc():
+    trigger = ActiveWindowTrigger(30, "00:00", "23:59", 0, start_date=datetime(2026, 7, 1, 10, 0))
+    assert trigger.start_date == utc(2026, 7, 1, 10, 0)
+
+
+def test_pickle_round_trip_keeps_schedule():
+    trigger = ActiveWindowTrigger(45, "22:00", "07:00", "Asia/Kolkata",
+                                  '[{"start": "02:00", "end": "03:30"}]',
+                                  start_date=datetime(2026, 7, 1, 12, 0))
+    state = trigger.__getstate__()
+    assert state["version"] == 1
+    assert state["timezone"] == "Asia/Kolkata"
+    assert state["quiet_hours"] == [(120, 210)]
+
+    restored = pickle.loads(pickle.dumps(trigger))
+    assert restored._wait == trigger._wait
+    assert repr(restored) == repr(trigger)
+    fire = None
+    fire_restored = None
+    for _ in range(20):
+        fire = trigger.get_next_fire_time(fire, fire)
+        fire_restored = restored.get_next_fire_time(fire_restored, fire_restored)
+        assert fire == fire_restored
+
+
+def test_integer_timezone_is_stored_as_zone_key():
+    trigger = ActiveWindowTrigger(60, "08:00", "22:00", -5)
+    assert trigger.timezone == "Etc/GMT+5"
+    assert pickle.loads(pickle.dumps(trigger)).timezone == "Etc/GMT+5"
@@ -0,0 +1,229 @@
+"""
+时区模块 (timezones.py)
+用户时区既可以是旧版的整数小时偏移（如 8 表示 UTC+8），也可以是 IANA 时区名
+（如 Asia/Kolkata、Australia/Adelaide），以支持夏令时和半小时时区。
+
+每个时区的 ZoneInfo 对象和 UTC 偏移切换表只计算一次并缓存在进程内，
+之后任意时刻的偏移查询只需一次二分查找，批量换算大量用户的本地时间和
+日界线时开销很小。
+"""
+
+import bisect
+import json
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# 用户时区：整数小时偏移或 IANA 时区名
+TimezoneSpec = Union[int, str]
+
+# 切换表覆盖的年份范围（相对当前年份）
+_TABLE_YEARS_BEFORE = 1
+_TABLE_YEARS_AFTER = 3
+
+
+def zone_key(tz: TimezoneSpec) -> str:
+    """把时区统一为 IANA 名称；整数偏移映射为 Etc/GMT±N（注意 Etc 区的符号相反）"""
+    if isinstance(tz, str):
+        return tz
+    offset = int(tz or 0)
+    if offset == 0:
+        return "Etc/UTC"
+    return f"Etc/GMT{-offset:+d}"
+
+
+@lru_cache(maxsize=None)
+def _zone(key: str) -> ZoneInfo:
+    return ZoneInfo(key)
+
+
+def resolve_zone(tz: TimezoneSpec) -> ZoneInfo:
+    """获取（缓存的）ZoneInfo 对象"""
+    return _zone(zone_key(tz))
+
+
+def is_valid_zone(name: str) -> bool:
+    """检查 IANA 时区名是否有效"""
+    try:
+        _zone(name)
+        return True
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+
+
+def parse_timezone(text: str) -> TimezoneSpec:
+    """解析用户输入的时区：整数小时偏移（-12 ~ 14）或 IANA 时区名
+
+    Raises:
+        ValueError: 无法识别的时区
+    """
+    text = text.strip()
+    try:
+        offset = int(text)
+    except ValueError:
+        if is_valid_zone(text):
+            return text
+        raise ValueError(f"未知时区: {text}")
+    if offset < -12 or offset > 14:
+        raise ValueError("时区范围应为 -12 ~ 14")
+    return offset
+
+
+def user_tz(user: Dict[str, Any]) -> TimezoneSpec:
+    """从用户设置中取时区：优先 IANA 时区名，否则使用整数偏移"""
+    return user.get("tz_name") or user.get("timezone") or 0
+
+
+def hhmm_to_minutes(value: str, default: int = -1) -> int:
+    """HH:MM → 当天的分钟数，格式错误时返回 default"""
+    try:
+        hour, minute = map(int, value.split(":"))
+        return hour * 60 + minute
+    except (AttributeError, ValueError):
+        return default
+
+
+def is_in_active_period(now: datetime, start_time_str: str, end_time_str: str) -> bool:
+    """判断本地时间 now 是否在活跃时段 [start, end) 内（start >= end 时跨越午夜，如 22:00 ~ 08:00）
+
+    时段格式错误时视为全天活跃。
+    """
+    try:
+        start_h, start_m = map(int, start_time_str.split(":"))
+        end_h, end_m = map(int, end_time_str.split(":"))
+    except (AttributeError, ValueError):
+        return True
+    now_minutes = now.hour * 60 + now.minute
+    start_minutes = start_h * 60 + start_m
+    end_minutes = end_h * 60 + end_m
+    if start_minutes < end_minutes:
+        return start_minutes <= now_minutes < end_minutes
+    return now_minutes >= start_minutes or now_minutes < end_minutes
+
+
+def parse_quiet_hours(value: Any) -> List[Dict[str, str]]:
+    """免打扰时段：接受 users.quiet_hours 的 JSON 文本或已解析的列表"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return []
+    return value or []
+
+
+# ==================== 偏移切换表 ====================
+
+class _TransitionTable:
+    """单个时区的 UTC 偏移切换表（UTC 时间戳 → 偏移秒数）"""
+
+    def __init__(self, key: str):
+        self.zone = _zone(key)
+        this_year = datetime.utcnow().year
+        self.start = datetime(this_year - _TABLE_YEARS_BEFORE, 1, 1, tzinfo=dt_timezone.utc).timestamp()
+        self.end = datetime(this_year + _TABLE_YEARS_AFTER, 1, 1, tzinfo=dt_timezone.utc).timestamp()
+        self.instants: List[float] = [self.start]
+        self.offsets: List[int] = [self._offset(self.start)]
+
+        # 按天扫描，发现偏移变化后在当天内二分到分钟精度
+        day = 86400
+        ts = self.start
+        while ts < self.end:
+            nxt = ts + day
+            offset = self._offset(nxt)
+            if offset != self.offsets[-1]:
+                lo, hi = ts, nxt
+                while hi - lo > 60:
+                    mid = lo + (hi - lo) // 2
+                    if self._offset(mid) == self.offsets[-1]:
+                        lo = mid
+                    else:
+                        hi = mid
+                self.instants.append(hi - hi % 60)
+                self.offsets.append(offset)
+            ts = nxt
+
+    def _offset(self, ts: float) -> int:
+        return int(datetime.fromtimestamp(ts, tz=self.zone).utcoffset().total_seconds())
+
+    def offset_at(self, ts: float) -> int:
+        """查询 UTC 时间戳处的偏移（秒）"""
+        if self.start <= ts < self.end:
+            return self.offsets[bisect.bisect_right(self.instants, ts) - 1]
+        return self._offset(ts)
+
+
+@lru_cache(maxsize=None)
+def _table(key: str) -> _TransitionTable:
+    return _TransitionTable(key)
+
+
+def _utc_timestamp(utc_dt: datetime) -> float:
+    """数据库中的时间均为 naive UTC"""
+    if utc_dt.tzinfo is None:
+        utc_dt = utc_dt.replace(tzinfo=dt_timezone.utc)
+    return utc_dt.timestamp()
+
+
+def utc_offset(tz: TimezoneSpec, utc_dt: Optional[datetime] = None) -> timedelta:
+    """获取时区在指定 UTC 时刻（默认当前）的偏移"""
+    utc_dt = utc_dt or datetime.utcnow()
+    return timedelta(seconds=_table(zone_key(tz)).offset_at(_utc_timestamp(utc_dt)))
+
+
+def utc_offsets_bulk(tzs: Iterable[TimezoneSpec], utc_dt: Optional[datetime] = None) -> List[int]:
+    """批量获取多个用户时区在同一 UTC 时刻的偏移（秒），相同时区只查一次"""
+    ts = _utc_timestamp(utc_dt or datetime.utcnow())
+    memo: Dict[str, int] = {}
+    result = []
+    for tz in tzs:
+        key = zone_key(tz)
+        if key not in memo:
+            memo[key] = _table(key).offset_at(ts)
+        result.append(memo[key])
+    return result
+
+
+# ==================== 换算 ====================
+
+def to_local(utc_dt: datetime, tz: TimezoneSpec) -> datetime:
+    """UTC 时间（naive）→ 用户本地时间（naive）"""
+    return utc_dt.replace(tzinfo=None) + utc_offset(tz, utc_dt)
+
+
+def to_utc(local_dt: datetime, tz: TimezoneSpec) -> datetime:
+    """用户本地时间（naive）→ UTC 时间（naive），夏令时跳变处按 ZoneInfo 规则处理"""
+    aware = local_dt.replace(tzinfo=resolve_zone(tz))
+    return aware.astimezone(dt_timezone.utc).replace(tzinfo=None)
+
+
+def local_now(tz: TimezoneSpec) -> datetime:
+    """用户当前本地时间（naive）"""
+    return to_local(datetime.utcnow(), tz)
+
+
+def day_bounds_utc(tz: TimezoneSpec, days_ago: int = 0, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """用户本地某一天（0 = 今天）的 UTC 起止时间 [start, end)
+
+    夏令时切换日长度为 23 或 25 小时，因此结束时间单独换算而不是 start + 1 天。
+    """
+    local_today = to_local(now or datetime.utcnow(), tz).date()
+    target: date = local_today - timedelta(days=days_ago)
+    start_local = datetime.combine(target, datetime.min.time())
+    return to_utc(start_local, tz), to_utc(start_local + timedelta(days=1), tz)
+
+
+def local_time_to_utc(tz: TimezoneSpec, hhmm: str, on_date: Optional[date] = None) -> datetime:
+    """用户本地某天（默认今天）的 HH:MM 对应的 UTC 时间（naive）"""
+    hour, minute = map(int, hhmm.split(":"))
+    on_date = on_date or local_now(tz).date()
+    return to_utc(datetime.combine(on_date, datetime.min.time()).replace(hour=hour, minute=minute), tz)
+
+
+def tz_label(tz: TimezoneSpec, utc_dt: Optional[datetime] = None) -> str:
+    """时区显示文本，如 UTC+8、UTC+5:30 (Asia/Kolkata)"""
+    seconds = int(utc_offset(tz, utc_dt).total_seconds())
+    sign = "+" if seconds >= 0 else "-"
+    hours, rem = divmod(abs(seconds), 3600)
+    offset_str = f"UTC{sign}{hours}" + (f":{rem // 60:02d}" if rem else "")
+    return f"{offset_str} ({tz})" if isinstance(tz, str) else offset_str
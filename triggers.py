@@ -0,0 +1,128 @@
+"""
+调度触发器模块 (triggers.py)
+ActiveWindowTrigger 按提醒间隔触发，但下次触发时间会直接跳到用户活跃时段内、
+免打扰时段外的最近时刻，夜间和免打扰时段内不会唤醒调度器，
+也就不会为了“不在活跃时段，跳过提醒”而查询数据库。
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, List, Optional, Tuple
+
+from apscheduler.triggers.base import BaseTrigger
+
+from timezones import TimezoneSpec, hhmm_to_minutes, parse_quiet_hours, resolve_zone, zone_key
+
+MINUTES_PER_DAY = 24 * 60
+
+# 夏令时切换日按 UTC 分钟跳转可能落在边界附近，最多重新校正几次
+_MAX_ADJUSTMENTS = 4
+
+
+def _allowed_minutes(start_time: str, end_time: str, quiet_hours: List[Tuple[int, int]]) -> bytearray:
+    """一天中每分钟是否允许提醒（活跃时段内且不在免打扰时段）"""
+    start = hhmm_to_minutes(start_time, 0)
+    end = hhmm_to_minutes(end_time, MINUTES_PER_DAY)
+    allowed = bytearray(MINUTES_PER_DAY)
+    for minute in range(MINUTES_PER_DAY):
+        # 与 is_in_active_period 一致：[start, end)，start >= end 时跨越午夜
+        if start < end:
+            active = start <= minute < end
+        else:
+            active = minute >= start or minute < end
+        # 与 is_in_quiet_hours 一致：start <= now <= end（不跨午夜）
+        quiet = any(q_start <= minute <= q_end for q_start, q_end in quiet_hours)
+        allowed[minute] = active and not quiet
+    return allowed
+
+
+def _wait_table(allowed: bytearray) -> Optional[List[int]]:
+    """每分钟到下一个允许提醒的分钟还需等待的分钟数；全天都不允许时返回 None"""
+    if not any(allowed):
+        return None
+    wait = [0] * MINUTES_PER_DAY
+    # 从后向前扫两遍，处理跨越午夜的等待
+    next_allowed = None
+    for i in range(2 * MINUTES_PER_DAY - 1, -1, -1):
+        minute = i % MINUTES_PER_DAY
+        if allowed[minute]:
+            next_allowed = i
+        if i < MINUTES_PER_DAY:
+            wait[minute] = next_allowed - i
+    return wait
+
+
+class ActiveWindowTrigger(BaseTrigger):
+    """只在活跃时段内、免打扰时段外触发的间隔触发器
+
+    Args:
+        interval_min: 提醒间隔（分钟）
+        start_time / end_time: 活跃时段（用户本地 HH:MM）
+        timezone: 用户时区（整数偏移或 IANA 时区名）
+        quiet_hours: 免打扰时段（JSON 文本或 [{"start", "end"}] 列表）
+        start_date: 第一次触发的最早时间（naive 视为 UTC）
+    """
+
+    __slots__ = ("interval", "start_time", "end_time", "timezone", "quiet_hours", "start_date", "_wait")
+
+    def __init__(self, interval_min: int, start_time: str, end_time: str, timezone: TimezoneSpec,
+                 quiet_hours: Any = None, start_date: Optional[datetime] = None):
+        self.interval = timedelta(minutes=max(1, int(interval_min)))
+        self.start_time = start_time
+        self.end_time = end_time
+        self.timezone = zone_key(timezone)
+        self.quiet_hours = [
+            (hhmm_to_minutes(period.get("start")), hhmm_to_minutes(period.get("end")))
+            for period in parse_quiet_hours(quiet_hours)
+        ]
+        start_date = start_date or datetime.utcnow()
+        if start_date.tzinfo is None:
+            start_date = start_date.replace(tzinfo=dt_timezone.utc)
+        self.start_date = start_date
+        self._wait = _wait_table(_allowed_minutes(start_time, end_time, self.quiet_hours))
+
+    def next_allowed(self, candidate: datetime) -> Optional[datetime]:
+        """不早于 candidate 的第一个允许提醒的时刻"""
+        if self._wait is None:
+            return None
+        zone = resolve_zone(self.timezone)
+        for _ in range(_MAX_ADJUSTMENTS):
+            local = candidate.astimezone(zone)
+            wait = self._wait[local.hour * 60 + local.minute]
+            if wait == 0:
+                return candidate
+            candidate = candidate.replace(second=0, microsecond=0) + timedelta(minutes=wait)
+        return candidate
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        if previous_fire_time is None:
+            candidate = self.start_date
+        else:
+            candidate = previous_fire_time + self.interval
+        return self.next_allowed(candidate)
+
+    def __getstate__(self):
+        return {
+            "version": 1,
+            "interval": self.interval,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "timezone": self.timezone,
+            "quiet_hours": self.quiet_hours,
+            "start_date": self.start_date,
+        }
+
+    def __setstate__(self, state):
+        self.interval = state["interval"]
+        self.start_time = state["start_time"]
+        self.end_time = state["end_time"]
+        self.timezone = state["timezone"]
+        self.quiet_hours = state["quiet_hours"]
+        self.start_date = state["start_date"]
+        self._wait = _wait_table(_allowed_minutes(self.start_time, self.end_time, self.quiet_hours))
+
+    def __str__(self):
+        return f"active_window[{self.start_time}-{self.end_time} {self.timezone}, every {self.interval}]"
+
+    def __repr__(self):
+        return (f"<{self.__class__.__name__} (interval={self.interval!r}, window='{self.start_time}-{self.end_time}', "
+                f"timezone='{self.timezone}', quiet_hours={self.quiet_hours!r})>")